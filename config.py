@@ -6,6 +6,7 @@ import logging
 from pathlib import Path
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
 from sqlalchemy.orm import sessionmaker, declarative_base
 from urllib.parse import quote_plus
 
@@ -37,9 +38,107 @@ DATABASE_URL = (
     f"@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 )
 
+# Engine profiles — choose one with DB_PROFILE in .env; any single value can
+# be overridden with the DB_POOL_* / DB_*_TIMEOUT_MS variables below.
+# Timeouts are in milliseconds (0 disables them), except connect_timeout, which
+# is the libpq limit in seconds for establishing a connection.
+ENGINE_PROFILES = {
+    # Single workstation talking to a local or nearby server
+    "desktop": dict(pool_size=2, max_overflow=3, pool_timeout=10, pool_recycle=1800,
+                    pool_pre_ping=True, statement_timeout=30000,
+                    idle_in_transaction_timeout=60000, connect_timeout=5, nullpool=False),
+    # Many teacher workstations sharing one PostgreSQL: keep each pool tiny
+    "lab": dict(pool_size=1, max_overflow=1, pool_timeout=15, pool_recycle=900,
+                pool_pre_ping=True, statement_timeout=15000,
+                idle_in_transaction_timeout=30000, connect_timeout=5, nullpool=False),
+    # Application server on a reliable network next to the database
+    "server": dict(pool_size=10, max_overflow=20, pool_timeout=30, pool_recycle=3600,
+                   pool_pre_ping=False, statement_timeout=60000,
+                   idle_in_transaction_timeout=120000, connect_timeout=10, nullpool=False),
+    # Load tests and benchmarks: fixed pool, no server-side limits
+    "benchmark": dict(pool_size=8, max_overflow=0, pool_timeout=30, pool_recycle=-1,
+                      pool_pre_ping=False, statement_timeout=0,
+                      idle_in_transaction_timeout=0, connect_timeout=10, nullpool=False),
+}
+DEFAULT_ENGINE_PROFILE = "desktop"
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def engine_settings(profile: str = None) -> dict:
+    """Return effective engine settings for a profile, with .env overrides applied."""
+    profile = (profile or os.getenv("DB_PROFILE") or DEFAULT_ENGINE_PROFILE).strip().lower()
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE '{profile}'. Choose one of: {', '.join(ENGINE_PROFILES)}")
+    base = ENGINE_PROFILES[profile]
+    return {
+        "profile": profile,
+        "pool_size": _env_int("DB_POOL_SIZE", base["pool_size"]),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", base["max_overflow"]),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", base["pool_timeout"]),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", base["pool_recycle"]),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", base["pool_pre_ping"]),
+        "statement_timeout": _env_int("DB_STATEMENT_TIMEOUT_MS", base["statement_timeout"]),
+        "idle_in_transaction_timeout": _env_int(
+            "DB_IDLE_TX_TIMEOUT_MS", base["idle_in_transaction_timeout"]),
+        "connect_timeout": _env_int("DB_CONNECT_TIMEOUT", base["connect_timeout"]),
+        "nullpool": _env_bool("DB_NULLPOOL", base["nullpool"]),
+        "application_name": os.getenv("DB_APPLICATION_NAME") or f"school_results:{profile}",
+    }
+
+
+def make_engine(settings: dict):
+    """Create an engine from ``engine_settings()`` output and log what it uses."""
+    options = (
+        f"-c statement_timeout={settings['statement_timeout']} "
+        f"-c idle_in_transaction_session_timeout={settings['idle_in_transaction_timeout']}"
+    )
+    kwargs = dict(
+        echo=False,
+        pool_pre_ping=settings["pool_pre_ping"],
+        connect_args={"application_name": settings["application_name"], "options": options,
+                      "connect_timeout": settings["connect_timeout"]},
+    )
+    if settings["nullpool"]:
+        # Short-lived CLI jobs: open and close a real connection per checkout
+        kwargs["poolclass"] = NullPool
+    else:
+        kwargs.update(
+            pool_size=settings["pool_size"],
+            max_overflow=settings["max_overflow"],
+            pool_timeout=settings["pool_timeout"],
+            pool_recycle=settings["pool_recycle"],
+        )
+    new_engine = create_engine(DATABASE_URL, **kwargs)
+    pool_desc = "NullPool" if settings["nullpool"] else (
+        f"pool_size={settings['pool_size']} max_overflow={settings['max_overflow']} "
+        f"pool_timeout={settings['pool_timeout']}s pool_recycle={settings['pool_recycle']}s"
+    )
+    logger.info(
+        f"Database engine: profile={settings['profile']} {pool_desc} "
+        f"pre_ping={settings['pool_pre_ping']} statement_timeout={settings['statement_timeout']}ms "
+        f"idle_in_transaction_timeout={settings['idle_in_transaction_timeout']}ms "
+        f"connect_timeout={settings['connect_timeout']}s "
+        f"application_name={settings['application_name']}"
+    )
+    return new_engine
+
+
 # SQLAlchemy setup
-engine = create_engine(DATABASE_URL, pool_pre_ping=True, echo=False)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ENGINE_SETTINGS = engine_settings()
+engine = make_engine(ENGINE_SETTINGS)
+# Objects stay loaded after commit; reads no longer re-fetch them on access
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 Base = declarative_base()
 
 # Application constants
@@ -56,6 +155,37 @@ GRADE_SCALE = [
     (0,  49,  "F", 0.0, "Fail"),
 ]
 
+# Lowest mark counted as a pass: the bottom of the lowest band worth GPA points
+PASS_MARK = min(low for low, _high, _grade, gpa, _remarks in GRADE_SCALE if gpa > 0)
+
+# Analytics cache: seconds an aggregate stays fresh, and how many are kept
+ANALYTICS_CACHE_TTL = _env_int("ANALYTICS_CACHE_TTL", 300)
+ANALYTICS_CACHE_SIZE = _env_int("ANALYTICS_CACHE_SIZE", 64)
+
+# Processes used for batch report cards (0 = one per CPU core)
+REPORT_WORKERS = _env_int("REPORT_WORKERS", 0)
+
+# Threads running background work for the UI (queries, reports, login). By
+# default one fewer than the pool can hand out, so the Tk thread always gets a
+# connection instead of waiting pool_timeout behind the workers.
+MAX_TASK_WORKERS = 4
+TASK_WORKERS = _env_int("TASK_WORKERS", MAX_TASK_WORKERS if ENGINE_SETTINGS["nullpool"] else max(
+    1, min(MAX_TASK_WORKERS, ENGINE_SETTINGS["pool_size"] + ENGINE_SETTINGS["max_overflow"] - 1)))
+
+# Search-as-you-type: quiet time (ms) before querying, and first pages kept per panel
+SEARCH_DEBOUNCE_MS = _env_int("SEARCH_DEBOUNCE_MS", 300)
+SEARCH_CACHE_SIZE = _env_int("SEARCH_CACHE_SIZE", 32)
+
+# Sidebar sections kept alive (hidden) per dashboard before the oldest is destroyed
+PANEL_CACHE_SIZE = _env_int("PANEL_CACHE_SIZE", 4)
+
+# Time allowed (ms) from launch to the login window; checked by `main.py --profile-startup`
+STARTUP_BUDGET_MS = _env_int("STARTUP_BUDGET_MS", 2000)
+
+# Schema migrations: how long (ms) DDL may wait for a table lock, and how often to retry
+MIGRATION_LOCK_TIMEOUT_MS = _env_int("MIGRATION_LOCK_TIMEOUT_MS", 5000)
+MIGRATION_LOCK_RETRIES = _env_int("MIGRATION_LOCK_RETRIES", 5)
+
 # Theme colours
 COLORS = {
     "primary":     "#1a237e",
@@ -100,12 +230,35 @@ def get_db():
 
 
 def init_db():
-    """Initialize database — create all tables."""
+    """Bring the schema up to date.
+
+    One ``schema_version`` query when the database is current; pending
+    migrations (including the initial table creation) are applied otherwise.
+    """
+    from migrations.schema import ensure_schema
     try:
-        # Clear any cached metadata to ensure fresh table inspection
-        Base.metadata.clear()
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created successfully.")
+        applied = ensure_schema()
+        if applied:
+            logger.info(f"Database migrations applied: {applied}")
     except Exception as e:
         logger.error(f"Database initialization failed: {e}")
         raise
+
+
+def warm_pool(count: int = None):
+    """Open ``count`` pooled connections up front (default: the pool size, at most 2).
+
+    Run during startup so the first screens after login do not pay for the
+    TCP/auth handshake. Does nothing with NullPool.
+    """
+    if ENGINE_SETTINGS["nullpool"]:
+        return 0
+    count = count or min(ENGINE_SETTINGS["pool_size"], 2)
+    conns = []
+    try:
+        for _ in range(count):
+            conns.append(engine.connect())
+    finally:
+        for conn in conns:
+            conn.close()
+    return len(conns)
@@ -2,15 +2,30 @@
 main.py - Application entry point
 School Examination Results Management System
 """
+import sys
+import time
+
+_LAUNCHED = time.perf_counter()
+PROFILE_STARTUP = "--profile-startup" in sys.argv
+if PROFILE_STARTUP:
+    # Installed before anything else is imported so every module is timed
+    from utils.startup_profile import startup_profiler
+    startup_profiler.start(_LAUNCHED)
+
+import os
 import tkinter as tk
 from tkinter import ttk, messagebox
 import logging
-import sys
 
 # ── Bootstrap ─────────────────────────────────────────────────────────────────
-from config import init_db, SessionLocal, COLORS, FONTS, APP_TITLE, WINDOW_SIZE
+from config import (
+    init_db, warm_pool, SessionLocal, COLORS, FONTS, APP_TITLE, WINDOW_SIZE,
+    STARTUP_BUDGET_MS, DB_HOST, DB_PORT,
+)
 from utils.ui_helpers import apply_treeview_style, center_window
 from services.auth_service import AuthService
+from services.session_manager import connection_tracker, release_thread_sessions, LEAK_THRESHOLD
+from utils.task_runner import init_task_runner
 
 logger = logging.getLogger(__name__)
 
@@ -18,8 +33,10 @@ logger = logging.getLogger(__name__)
 class Application(tk.Tk):
     """Root application controller."""
 
-    def __init__(self):
+    def __init__(self, profile_startup: bool = False):
         super().__init__()
+        self._profile_startup = profile_startup
+        self.exit_code = 0
         self.title(APP_TITLE)
         self.geometry(WINDOW_SIZE)
         self.configure(bg=COLORS["bg_medium"])
@@ -32,27 +49,57 @@ class Application(tk.Tk):
         style = ttk.Style(self)
         apply_treeview_style(style)
 
-        # Initialise database
-        try:
-            init_db()
-        except Exception as e:
-            messagebox.showerror(
-                "Database Error",
-                f"Could not connect to the database.\n\n{e}\n\n"
-                "Please check your .env file and ensure PostgreSQL is running."
-            )
-            self.destroy()
-            sys.exit(1)
-
-        # Seed default admin if needed
+        self._current_dashboard = None
+        self._login_view = None
+        self._db_ready = False
+        self.tasks_busy = False
+        self._db_status = (False, "Connecting to database…", False)
+        # Shared background executor for every view; workers drop their sessions after each task
+        self.tasks = init_task_runner(self, thread_cleanup=release_thread_sessions)
+        # The login window comes up at once; the database is prepared behind it
+        self._show_login()
+        self._start_database()
+
+    # ── Database startup ──────────────────────────────────────────────────────
+
+    def _start_database(self):
+        self.tasks.submit(self._prepare_database, on_done=self._on_database_ready,
+                          on_error=self._on_database_failed, key="startup")
+
+    @staticmethod
+    def _prepare_database():
+        """Runs on a worker thread: schema check, default admin and pool warm-up."""
+        init_db()
         db = SessionLocal()
         try:
             AuthService(db).seed_default_admin()
         finally:
             db.close()
-
-        self._current_dashboard = None
-        self._show_login()
+        warm_pool()
+
+    def _on_database_ready(self, _result):
+        self._db_ready = True
+        self._set_db_status(True, "Connected. Ready to sign in.")
+        self._check_connections()
+
+    def _on_database_failed(self, error):
+        logger.error(f"Database startup failed: {error}")
+        self._set_db_status(
+            False,
+            f"Could not connect to the database at {DB_HOST}:{DB_PORT}: {error}\n"
+            "Check your .env file and that PostgreSQL is running.",
+            error=True,
+        )
+
+    def _set_db_status(self, ready: bool, message: str, error: bool = False):
+        self._db_status = (ready, message, error)
+        if self._login_view is not None and self._login_view.winfo_exists():
+            self._login_view.set_status(ready, message, error)
+
+    def _check_connections(self):
+        """Periodically log pooled connections that were never returned."""
+        connection_tracker().report_leaks()
+        self.after(int(LEAK_THRESHOLD * 1000), self._check_connections)
 
     # ── Login flow ────────────────────────────────────────────────────────────
 
@@ -60,15 +107,40 @@ class Application(tk.Tk):
         # Hide root window; show login Toplevel
         self.withdraw()
         from views.login_view import LoginView
-        LoginView(self, on_login_success=self._authenticate)
-
-    def _authenticate(self, email: str, password: str, admission_number: str = None):
+        self._login_view = LoginView(self, on_login_success=self._authenticate,
+                                     on_retry=self._start_database)
+        self._login_view.set_status(*self._db_status)
+        if self._profile_startup:
+            self._profile_startup = False
+            self._login_view.update()
+            self.after_idle(self._finish_startup_profile)
+
+    def _finish_startup_profile(self):
+        """Report the `--profile-startup` breakdown and quit."""
+        from utils.startup_profile import startup_profiler
+        startup_profiler.mark("login window shown")
+        startup_profiler.stop()
+        if not startup_profiler.report(budget_ms=STARTUP_BUDGET_MS):
+            self.exit_code = 1
+        self.destroy()
+
+    @staticmethod
+    def _login(email: str, password: str, admission_number: str = None):
         db = SessionLocal()
         try:
-            user, role = AuthService(db).login(email, password, admission_number)
+            return AuthService(db).login(email, password, admission_number)
         finally:
             db.close()
 
+    def _authenticate(self, email: str, password: str, admission_number: str = None):
+        if not self._db_ready:
+            return
+        # bcrypt and the lookup run off the Tk thread; a second click supersedes the first
+        self.tasks.submit(self._login, email, password, admission_number,
+                          on_done=self._on_login, key="login")
+
+    def _on_login(self, outcome):
+        user, role = outcome
         if not user:
             messagebox.showerror("Login Failed",
                                  "Invalid credentials. Please try again.")
@@ -103,14 +175,19 @@ class Application(tk.Tk):
             messagebox.showerror("Access Denied", f"Unknown role: {role}")
             self._logout()
 
+    def destroy(self):
+        """Closing the window (root or login) also stops background work."""
+        self.tasks_busy = self.tasks.shutdown(wait=False, cancel_futures=True)
+        super().destroy()
+
     def _logout(self):
+        self.tasks.cancel_all()
         if self._current_dashboard:
-            # Close any open db sessions
-            if hasattr(self._current_dashboard, "_db"):
-                try:
-                    self._current_dashboard._db.close()
-                except Exception:
-                    pass
+            # Close the dashboard's db sessions and report leaked connections
+            try:
+                self._current_dashboard.close_sessions()
+            except Exception as e:
+                logger.error(f"Error closing dashboard sessions: {e}")
         for widget in self.winfo_children():
             widget.destroy()
         self._current_dashboard = None
@@ -118,8 +195,15 @@ class Application(tk.Tk):
 
 
 def main():
-    app = Application()
+    app = Application(profile_startup=PROFILE_STARTUP)
     app.mainloop()
+    if app.tasks_busy:
+        # Pool workers are joined at interpreter exit; don't keep a windowless
+        # process alive until a running export or connect attempt finishes
+        logger.warning("Exiting with a background task still running")
+        logging.shutdown()
+        os._exit(app.exit_code)
+    sys.exit(app.exit_code)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,219 @@
+"""
+Secondary and covering indexes for the results hot paths, with a benchmark.
+
+Applied online as schema migration 4 (``python migrations/schema.py upgrade``).
+Run this script with ``--benchmark`` to justify each index on a synthetic
+dataset: it builds a throwaway copy of the schema in its own PostgreSQL
+schema, fills it (1,000,000 results by default), times each query the index
+serves before and after creating it, prints the plans' scan types and drops
+the copy again.
+
+    python migrations/add_performance_indexes.py --benchmark [--results N] [--keep]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text, column
+from config import Base, logger, PASS_MARK
+# Registers every table on Base.metadata
+import models  # noqa: F401
+from models.grade_scale import grade_scale
+
+# name -> (table, columns, INCLUDE columns, WHERE predicate)
+PERFORMANCE_INDEXES = {
+    # get_by_subject, teacher-scoped result lists (subject_id IN ...) and the
+    # per-subject averages; INCLUDE lets the averages use index-only scans
+    "ix_results_subject_id": ("results", "subject_id", "marks, grade", None),
+    # Class rosters, class results and every class-scoped analytics filter
+    "ix_students_class_id": ("students", "class_id", None, None),
+    # Teacher dashboards load their subjects by teacher
+    "ix_subjects_teacher_id": ("subjects", "teacher_id", None, None),
+    # Subjects of a class (class lists, subject pickers)
+    "ix_subjects_class_id": ("subjects", "class_id", None, None),
+    # Leaderboards: ORDER BY avg_marks DESC LIMIT n over students with results
+    "ix_student_summary_leaderboard": ("student_summary", "avg_marks DESC", None, "result_count > 0"),
+}
+# results(student_id) is already served by uq_student_subject (student_id, subject_id)
+
+# Schema holding the benchmark copy of the tables
+BENCH_SCHEMA = "perf_bench"
+
+# The queries each index serves: (index, description, parameter kind, SQL)
+BENCH_QUERIES = [
+    ("ix_results_subject_id", "results of one subject", "subject",
+     "SELECT * FROM {s}.results WHERE subject_id = :p"),
+    ("ix_results_subject_id", "average marks of a teacher's subjects", "teacher",
+     "SELECT subject_id, avg(marks), count(*) FROM {s}.results "
+     "WHERE subject_id IN (SELECT id FROM {s}.subjects WHERE teacher_id = :p) GROUP BY subject_id"),
+    ("ix_students_class_id", "results of one class", "class",
+     "SELECT r.* FROM {s}.results r JOIN {s}.students st ON st.id = r.student_id "
+     "WHERE st.class_id = :p"),
+    ("ix_subjects_teacher_id", "subjects of one teacher", "teacher",
+     "SELECT * FROM {s}.subjects WHERE teacher_id = :p"),
+    ("ix_subjects_class_id", "subjects of one class", "class",
+     "SELECT * FROM {s}.subjects WHERE class_id = :p"),
+    ("ix_student_summary_leaderboard", "top 5 students", None,
+     "SELECT student_id, avg_marks FROM {s}.student_summary "
+     "WHERE result_count > 0 ORDER BY avg_marks DESC LIMIT 5"),
+]
+
+SUBJECTS_PER_CLASS = 10
+STUDENTS_PER_CLASS = 1000
+CLASSES_PER_TEACHER = 5
+
+
+def create_performance_indexes(conn, schema: str = None):
+    """Create every index in PERFORMANCE_INDEXES (autocommit connection)."""
+    from migrations.schema import create_index_concurrently
+    prefix = f"{schema}." if schema else ""
+    for name, (table, columns, include, where) in PERFORMANCE_INDEXES.items():
+        create_index_concurrently(conn, name, prefix + table, columns, include=include, where=where)
+        conn.execute(text(f"ANALYZE {prefix}{table}"))
+
+
+def drop_performance_indexes(conn, schema: str = None):
+    from migrations.schema import drop_index_concurrently
+    prefix = f"{schema}." if schema else ""
+    for name in PERFORMANCE_INDEXES:
+        drop_index_concurrently(conn, prefix + name)
+
+
+# ── Benchmark ────────────────────────────────────────────────────────────────
+
+def _seed(conn, results: int):
+    """Fill the benchmark schema with ``results`` results in realistic proportions."""
+    s = BENCH_SCHEMA
+    # Grades come from the application's own scale, as ResultService writes them
+    grade, gpa, remarks = (
+        grade_scale.sql_case(column("marks"), field).compile(
+            dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+        for field in ("grade", "gpa", "remarks")
+    )
+    classes = max(1, results // (STUDENTS_PER_CLASS * SUBJECTS_PER_CLASS))
+    teachers = max(1, classes * SUBJECTS_PER_CLASS // CLASSES_PER_TEACHER)
+    statements = [
+        f"INSERT INTO {s}.classes (id, class_name, academic_year, created_at) "
+        f"SELECT g, 'Class ' || g, (2020 + g % 5)::text, now() FROM generate_series(1, {classes}) g",
+        f"INSERT INTO {s}.teachers (id, full_name, email, password_hash, role, created_at) "
+        f"SELECT g, 'Teacher ' || g, 't' || g || '@bench.local', 'x', 'TEACHER', now() "
+        f"FROM generate_series(1, {teachers}) g",
+        f"INSERT INTO {s}.subjects (id, subject_name, class_id, teacher_id, created_at) "
+        f"SELECT g, 'Subject ' || g, (g - 1) / {SUBJECTS_PER_CLASS} + 1, (g - 1) % {teachers} + 1, now() "
+        f"FROM generate_series(1, {classes * SUBJECTS_PER_CLASS}) g",
+        f"INSERT INTO {s}.students (id, admission_number, first_name, last_name, gender, class_id, created_at) "
+        f"SELECT g, 'ADM' || g, 'First' || g, 'Last' || g, "
+        f"CASE WHEN g % 2 = 0 THEN 'Male' ELSE 'Female' END, (g - 1) / {STUDENTS_PER_CLASS} + 1, now() "
+        f"FROM generate_series(1, {classes * STUDENTS_PER_CLASS}) g",
+        # Every student sits every subject of their class
+        f"INSERT INTO {s}.results (student_id, subject_id, marks, grade, gpa, remarks, created_at, updated_at) "
+        f"SELECT student_id, subject_id, marks, {grade}, {gpa}, {remarks}, now(), now() "
+        f"FROM (SELECT st.id AS student_id, sub.id AS subject_id, "
+        f"round((random() * 100)::numeric, 1)::float AS marks "
+        f"FROM {s}.students st JOIN {s}.subjects sub ON sub.class_id = st.class_id) m",
+        f"INSERT INTO {s}.student_summary (student_id, total_marks, result_count, avg_marks, avg_gpa, pass_count, updated_at) "
+        f"SELECT student_id, sum(marks), count(*), avg(marks), avg(gpa), "
+        f"count(*) FILTER (WHERE marks >= {PASS_MARK}), now() FROM {s}.results GROUP BY student_id",
+    ]
+    for statement in statements:
+        conn.execute(text(statement))
+    for table in ("classes", "teachers", "subjects", "students", "results", "student_summary"):
+        conn.execute(text(f"VACUUM ANALYZE {s}.{table}"))
+    return classes, teachers
+
+
+def _measure(conn, sql: str, param: int, runs: int):
+    """Median wall time (ms) of ``runs`` executions, plus the plan's scan nodes."""
+    plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), {"p": param}).scalar()
+    scans = sorted(_scan_nodes(plan[0]["Plan"]))
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        conn.execute(text(sql), {"p": param}).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), scans
+
+
+def _scan_nodes(node):
+    if "Scan" in node["Node Type"]:
+        yield f"{node['Node Type']}" + (f" ({node['Index Name']})" if "Index Name" in node else "")
+    for child in node.get("Plans", ()):
+        yield from _scan_nodes(child)
+
+
+def benchmark(results: int = 1_000_000, runs: int = 20, keep: bool = False):
+    """Time each index's queries before and after creating it on a synthetic dataset."""
+    from config import engine
+    s = BENCH_SCHEMA
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        conn.execute(text("SET statement_timeout = 0"))
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {s} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {s}"))
+        try:
+            # Same tables and model-declared indexes as the application schema
+            Base.metadata.create_all(bind=conn.execution_options(schema_translate_map={None: s}),
+                                     checkfirst=False)
+            print(f"Seeding {results:,} results into schema {s} ...")
+            started = time.perf_counter()
+            classes, teachers = _seed(conn, results)
+            print(f"Seeded in {time.perf_counter() - started:.1f}s "
+                  f"({classes} classes, {teachers} teachers)")
+            # A class, subject and teacher from the middle of the id range
+            params = {
+                "subject": max(1, classes * SUBJECTS_PER_CLASS // 2),
+                "class": max(1, classes // 2),
+                "teacher": max(1, teachers // 2),
+                None: 0,
+            }
+
+            before = {}
+            for index, label, kind, sql in BENCH_QUERIES:
+                before[label] = _measure(conn, sql.format(s=s), params[kind], runs)
+
+            started = time.perf_counter()
+            create_performance_indexes(conn, schema=s)
+            print(f"Indexes built in {time.perf_counter() - started:.1f}s")
+
+            print(f"\n{'index':32s} {'query':40s} {'before ms':>10s} {'after ms':>10s} {'speedup':>8s}")
+            for index, label, kind, sql in BENCH_QUERIES:
+                after = _measure(conn, sql.format(s=s), params[kind], runs)
+                was = before[label]
+                speedup = was[0] / after[0] if after[0] else float("inf")
+                print(f"{index:32s} {label:40s} {was[0]:10.2f} {after[0]:10.2f} {speedup:7.1f}x")
+                print(f"{'':32s}   before: {', '.join(was[1])}")
+                print(f"{'':32s}   after:  {', '.join(after[1])}")
+            size = conn.execute(text(
+                "SELECT pg_size_pretty(sum(pg_relation_size(to_regclass(:s || '.' || n)))) "
+                "FROM unnest(CAST(:names AS text[])) n"
+            ), {"s": s, "names": list(PERFORMANCE_INDEXES)}).scalar()
+            print(f"\nTotal size of the new indexes: {size}")
+        finally:
+            if not keep:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {s} CASCADE"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--benchmark", action="store_true",
+                        help="time the indexed queries on a synthetic dataset instead of migrating")
+    parser.add_argument("--results", type=int, default=1_000_000, help="synthetic results to generate")
+    parser.add_argument("--runs", type=int, default=20, help="timed executions per query")
+    parser.add_argument("--keep", action="store_true", help=f"keep the {BENCH_SCHEMA} schema afterwards")
+    args = parser.parse_args()
+    try:
+        if args.benchmark:
+            benchmark(args.results, args.runs, args.keep)
+        else:
+            from migrations.schema import upgrade
+            print(f"Applied: {upgrade() or 'nothing to do'}")
+        print("Migration completed successfully!")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        logger.error(f"Migration failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,62 @@
+"""
+Database migration script to add trigram search indexes on the students table.
+Enables pg_trgm and creates GIN indexes used by StudentService search; falls
+back to lower() prefix indexes on servers where the extension is unavailable.
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from config import engine, logger
+
+TRIGRAM_INDEXES = {
+    "ix_students_first_name_trgm": "first_name gin_trgm_ops",
+    "ix_students_last_name_trgm": "last_name gin_trgm_ops",
+    "ix_students_full_name_trgm": "(first_name || ' ' || last_name) gin_trgm_ops",
+    "ix_students_admission_number_trgm": "admission_number gin_trgm_ops",
+}
+
+FALLBACK_INDEXES = {
+    "ix_students_first_name_lower": "lower(first_name) text_pattern_ops",
+    "ix_students_last_name_lower": "lower(last_name) text_pattern_ops",
+    "ix_students_admission_number_lower": "lower(admission_number) text_pattern_ops",
+}
+
+
+def migrate_add_student_trigram_indexes():
+    """Create trigram GIN indexes on student names and admission numbers."""
+
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            conn.commit()
+            using, indexes = "gin", TRIGRAM_INDEXES
+        except Exception as e:
+            conn.rollback()
+            logger.warning(f"pg_trgm unavailable, creating prefix indexes instead: {e}")
+            print("pg_trgm unavailable - creating lower() prefix indexes instead")
+            using, indexes = "btree", FALLBACK_INDEXES
+
+        for name, expression in indexes.items():
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS {name} ON students USING {using} ({expression})"
+            ))
+            conn.commit()
+            logger.info(f"Index ensured: {name}")
+            print(f"Index ensured: {name}")
+
+        conn.execute(text("ANALYZE students"))
+        conn.commit()
+
+
+if __name__ == "__main__":
+    try:
+        migrate_add_student_trigram_indexes()
+        print("Migration completed successfully!")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        logger.error(f"Migration failed: {e}")
+        sys.exit(1)
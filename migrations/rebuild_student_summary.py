@@ -0,0 +1,37 @@
+"""
+Database migration script to create and (re)build the student_summary table.
+Safe to re-run at any time to repair summaries that drifted from results.
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import engine, SessionLocal, logger
+from models.student_summary import StudentSummary
+from services.summary_service import SummaryService
+
+
+def migrate_rebuild_student_summary():
+    """Create student_summary if missing and recompute every row from results."""
+
+    StudentSummary.__table__.create(bind=engine, checkfirst=True)
+    print("Table ensured: student_summary")
+
+    db = SessionLocal()
+    try:
+        count = SummaryService(db).rebuild()
+        print(f"Student summaries rebuilt: {count} row(s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    try:
+        migrate_rebuild_student_summary()
+        print("Migration completed successfully!")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        logger.error(f"Migration failed: {e}")
+        sys.exit(1)
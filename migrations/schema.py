@@ -0,0 +1,321 @@
+"""
+Versioned schema migrations and their up/down runner.
+
+The database records the migrations applied to it in ``schema_version``;
+startup (``config.init_db``) reads the highest version with one query and
+only does more when a migration is pending. Add a migration by appending a
+``Migration`` with the next version number to ``MIGRATIONS``.
+
+Migrations with ``transactional=False`` run on an autocommit connection so
+they can use online DDL such as ``CREATE INDEX CONCURRENTLY`` (see
+``create_index_concurrently``); every migration runs with ``lock_timeout``
+set so DDL gives up and retries instead of queueing behind marking.
+
+Usage:
+    python migrations/schema.py status
+    python migrations/schema.py upgrade [version]
+    python migrations/schema.py downgrade <version>
+"""
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text, select, func, delete
+from sqlalchemy.exc import DBAPIError, ProgrammingError
+from sqlalchemy.orm import Session
+from config import (
+    engine, make_engine, ENGINE_SETTINGS, Base, logger,
+    MIGRATION_LOCK_TIMEOUT_MS, MIGRATION_LOCK_RETRIES,
+)
+# Registers every table on Base.metadata
+import models  # noqa: F401
+from models.schema_version import SchemaVersion
+
+# Key for pg_advisory_lock, so two workstations never migrate at once
+MIGRATION_LOCK_KEY = 72_519_001
+
+# SQLSTATE raised when lock_timeout expires
+LOCK_NOT_AVAILABLE = "55P03"
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One schema step. ``up``/``down`` take a connection; ``down=None`` is irreversible."""
+    version: int
+    name: str
+    up: Callable
+    down: Optional[Callable] = None
+    transactional: bool = True
+
+
+# ── Online DDL helpers ───────────────────────────────────────────────────────
+
+def _lock_timeout_retry(conn, statement: str, retries: int = MIGRATION_LOCK_RETRIES):
+    """Run ``statement``, retrying with backoff when it hits lock_timeout."""
+    for attempt in range(1, retries + 1):
+        try:
+            conn.execute(text(statement))
+            return
+        except DBAPIError as e:
+            if getattr(e.orig, "pgcode", None) != LOCK_NOT_AVAILABLE or attempt == retries:
+                raise
+            delay = min(2 ** attempt, 30)
+            logger.warning(f"Lock timeout ({attempt}/{retries}), retrying in {delay}s: {statement}")
+            time.sleep(delay)
+
+
+def create_index_concurrently(conn, name: str, table: str, columns: str, using: str = "btree",
+                              include: str = None, where: str = None):
+    """Build an index without blocking writes to ``table``.
+
+    Needs an autocommit connection (a ``transactional=False`` migration). An
+    INVALID index left behind by an interrupted build is dropped first, as
+    IF NOT EXISTS would otherwise keep it.
+    """
+    # The index lives in the table's schema
+    qualified = f"{table.rsplit('.', 1)[0]}.{name}" if "." in table else name
+    valid = conn.execute(text(
+        "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"
+    ), {"name": qualified}).scalar()
+    if valid is False:
+        logger.warning(f"Dropping invalid index {qualified} left by an earlier build")
+        drop_index_concurrently(conn, qualified)
+    statement = f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING {using} ({columns})"
+    if include:
+        statement += f" INCLUDE ({include})"
+    if where:
+        statement += f" WHERE {where}"
+    _lock_timeout_retry(conn, statement)
+    logger.info(f"Index ensured: {qualified}")
+
+
+def drop_index_concurrently(conn, name: str):
+    """Drop an index (optionally schema-qualified) without blocking writes to its table."""
+    _lock_timeout_retry(conn, f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+# ── Migrations ───────────────────────────────────────────────────────────────
+
+def _create_tables(conn):
+    # checkfirst: databases created before versioning keep their tables
+    Base.metadata.create_all(bind=conn, checkfirst=True)
+
+
+def _backfill_student_summary(conn):
+    from services.summary_service import SummaryService
+    db = Session(bind=conn)
+    try:
+        SummaryService(db).rebuild()
+    finally:
+        db.close()
+
+
+def _clear_student_summary(conn):
+    conn.execute(text("DELETE FROM student_summary"))
+
+
+def _create_student_search_indexes(conn):
+    from migrations.add_student_trigram_indexes import TRIGRAM_INDEXES, FALLBACK_INDEXES
+    installed = conn.execute(text(
+        "SELECT count(*) FROM pg_extension WHERE extname = 'pg_trgm'")).scalar()
+    available = installed or conn.execute(text(
+        "SELECT count(*) FROM pg_available_extensions WHERE name = 'pg_trgm'")).scalar()
+    using, indexes = "btree", FALLBACK_INDEXES
+    if installed:
+        using, indexes = "gin", TRIGRAM_INDEXES
+    elif available:
+        # Needs CREATE on the database; app roles often lack it
+        try:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            using, indexes = "gin", TRIGRAM_INDEXES
+        except DBAPIError as e:
+            logger.warning(f"Could not create pg_trgm, creating lower() prefix indexes instead: {e}")
+    else:
+        logger.warning("pg_trgm unavailable, creating lower() prefix indexes instead")
+    for name, expression in indexes.items():
+        create_index_concurrently(conn, name, "students", expression, using=using)
+    conn.execute(text("ANALYZE students"))
+
+
+def _drop_student_search_indexes(conn):
+    from migrations.add_student_trigram_indexes import TRIGRAM_INDEXES, FALLBACK_INDEXES
+    for name in (*TRIGRAM_INDEXES, *FALLBACK_INDEXES):
+        drop_index_concurrently(conn, name)
+
+
+def _create_performance_indexes(conn):
+    from migrations.add_performance_indexes import create_performance_indexes
+    create_performance_indexes(conn)
+
+
+def _drop_performance_indexes(conn):
+    from migrations.add_performance_indexes import drop_performance_indexes
+    drop_performance_indexes(conn)
+
+
+def _create_student_keyset_index(conn):
+    create_index_concurrently(conn, "ix_students_first_name_id", "students", "first_name, id")
+    conn.execute(text("ANALYZE students"))
+
+
+def _drop_student_keyset_index(conn):
+    drop_index_concurrently(conn, "ix_students_first_name_id")
+
+
+MIGRATIONS = [
+    Migration(1, "baseline tables", _create_tables),
+    Migration(2, "backfill student_summary", _backfill_student_summary, _clear_student_summary),
+    Migration(3, "student search indexes", _create_student_search_indexes,
+              _drop_student_search_indexes, transactional=False),
+    Migration(4, "results hot-path indexes", _create_performance_indexes,
+              _drop_performance_indexes, transactional=False),
+    Migration(5, "student keyset pagination index", _create_student_keyset_index,
+              _drop_student_keyset_index, transactional=False),
+]
+
+
+# ── Runner ───────────────────────────────────────────────────────────────────
+
+def head() -> int:
+    """Version the code expects."""
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def current_version(conn=None) -> int:
+    """Highest applied version; 0 for a database that has never been stamped."""
+    if conn is None:
+        with engine.connect() as conn:
+            return current_version(conn)
+    try:
+        return conn.execute(select(func.coalesce(func.max(SchemaVersion.version), 0))).scalar()
+    except ProgrammingError:
+        conn.rollback()
+        return 0
+
+
+def _migration_engine():
+    # Own NullPool engine: no statement_timeout for long builds, and the
+    # session settings below never leak into the application's pool
+    return make_engine({**ENGINE_SETTINGS, "nullpool": True, "statement_timeout": 0,
+                        "application_name": f"{ENGINE_SETTINGS['application_name']}:migrate"})
+
+
+@contextmanager
+def _migration_lock(bind):
+    """Hold the advisory lock on a connection of its own for the whole run."""
+    with bind.connect() as lock_conn:
+        lock_conn = lock_conn.execution_options(isolation_level="AUTOCOMMIT")
+        lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        try:
+            yield
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+
+
+@contextmanager
+def _step_connection(bind, migration):
+    lock_timeout = f"SET lock_timeout = {int(MIGRATION_LOCK_TIMEOUT_MS)}"
+    with bind.connect() as conn:
+        if migration.transactional:
+            with conn.begin():
+                conn.execute(text(lock_timeout))
+                yield conn
+        else:
+            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+            conn.execute(text(lock_timeout))
+            yield conn
+
+
+def upgrade(target: int = None) -> list:
+    """Apply pending migrations up to ``target`` (default: head); returns their versions."""
+    target = head() if target is None else target
+    bind = _migration_engine()
+    applied = []
+    try:
+        with _migration_lock(bind):
+            with bind.begin() as conn:
+                SchemaVersion.__table__.create(bind=conn, checkfirst=True)
+                version = current_version(conn)
+            for migration in MIGRATIONS:
+                if not version < migration.version <= target:
+                    continue
+                logger.info(f"Applying migration {migration.version}: {migration.name}")
+                started = time.perf_counter()
+                with _step_connection(bind, migration) as conn:
+                    migration.up(conn)
+                    conn.execute(SchemaVersion.__table__.insert().values(
+                        version=migration.version, name=migration.name))
+                logger.info(f"Migration {migration.version} applied in "
+                            f"{time.perf_counter() - started:.1f}s")
+                applied.append(migration.version)
+    finally:
+        bind.dispose()
+    return applied
+
+
+def downgrade(target: int) -> list:
+    """Revert applied migrations above ``target``, newest first; returns their versions."""
+    bind = _migration_engine()
+    reverted = []
+    try:
+        with _migration_lock(bind):
+            version = current_version()
+            for migration in reversed(MIGRATIONS):
+                if not target < migration.version <= version:
+                    continue
+                if migration.down is None:
+                    raise ValueError(f"Migration {migration.version} ({migration.name}) cannot be reverted.")
+                logger.info(f"Reverting migration {migration.version}: {migration.name}")
+                with _step_connection(bind, migration) as conn:
+                    migration.down(conn)
+                    conn.execute(delete(SchemaVersion).where(SchemaVersion.version == migration.version))
+                reverted.append(migration.version)
+    finally:
+        bind.dispose()
+    return reverted
+
+
+def ensure_schema() -> list:
+    """Startup check: one version query, and an upgrade only when one is pending."""
+    version = current_version()
+    if version >= head():
+        return []
+    logger.info(f"Database schema at version {version}, upgrading to {head()}")
+    return upgrade()
+
+
+def status():
+    version = current_version()
+    print(f"Database schema version: {version} (head {head()})")
+    for migration in MIGRATIONS:
+        mark = "applied" if migration.version <= version else "pending"
+        kind = "" if migration.transactional else " [online]"
+        print(f"  {migration.version:4d}  {mark:8s} {migration.name}{kind}")
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+    try:
+        if command == "status":
+            status()
+        elif command == "upgrade":
+            done = upgrade(int(sys.argv[2]) if len(sys.argv) > 2 else None)
+            print(f"Applied: {done or 'nothing to do'}")
+        elif command == "downgrade" and len(sys.argv) > 2:
+            done = downgrade(int(sys.argv[2]))
+            print(f"Reverted: {done or 'nothing to do'}")
+        else:
+            print(__doc__)
+            sys.exit(2)
+        if command != "status":
+            print("Migration completed successfully!")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        logger.error(f"Migration failed: {e}")
+        sys.exit(1)
@@ -3,3 +3,5 @@ from .student import Student
 from .class_model import Class
 from .subject import Subject
 from .result import Result
+from .student_summary import StudentSummary
+from .schema_version import SchemaVersion
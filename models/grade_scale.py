@@ -0,0 +1,68 @@
+"""
+models/grade_scale.py - Compiled grade scale shared by every grading path
+"""
+import math
+from bisect import bisect_right
+from sqlalchemy import case
+from config import GRADE_SCALE
+
+
+class GradeScale:
+    """
+    Grade bands compiled for fast lookup.
+
+    Bands are keyed by their lower bound only, so a mark belongs to the band
+    with the greatest lower bound not above it; fractional marks such as 79.5
+    fall into the band below the next boundary ("B") instead of dropping
+    through to "F". Marks below the lowest bound get the lowest band.
+    NaN and infinite marks are rejected with ValueError rather than graded.
+    """
+
+    def __init__(self, bands):
+        bands = sorted(bands, key=lambda b: b[0])
+        self.lows = [float(b[0]) for b in bands]
+        self.grades = [b[2] for b in bands]
+        self.gpas = [float(b[3]) for b in bands]
+        self.remarks = [b[4] for b in bands]
+
+    @classmethod
+    def from_config(cls):
+        return cls(GRADE_SCALE)
+
+    def _index(self, marks: float) -> int:
+        if not math.isfinite(marks):
+            raise ValueError(f"Cannot grade a non-finite mark: {marks}")
+        return max(bisect_right(self.lows, marks) - 1, 0)
+
+    def lookup(self, marks: float):
+        """Return (grade, gpa, remarks) for a single mark."""
+        i = self._index(marks)
+        return self.grades[i], self.gpas[i], self.remarks[i]
+
+    def grade_many(self, marks):
+        """Grade an array of marks at once.
+
+        Returns NumPy arrays (grades, gpas, remarks) aligned with ``marks``.
+        """
+        import numpy as np
+        marks = np.asarray(marks, dtype=float)
+        if not np.isfinite(marks).all():
+            raise ValueError("Cannot grade non-finite marks (NaN or infinity).")
+        idx = np.searchsorted(np.asarray(self.lows), marks, side="right") - 1
+        np.clip(idx, 0, len(self.lows) - 1, out=idx)
+        return (
+            np.asarray(self.grades, dtype=object)[idx],
+            np.asarray(self.gpas, dtype=float)[idx],
+            np.asarray(self.remarks, dtype=object)[idx],
+        )
+
+    def sql_case(self, column, field: str):
+        """Return a SQL CASE expression mapping ``column`` to grade, gpa or remarks."""
+        values = {"grade": self.grades, "gpa": self.gpas, "remarks": self.remarks}[field]
+        whens = [(column >= low, value) for low, value in zip(reversed(self.lows[1:]),
+                                                               reversed(values[1:]))]
+        return case(*whens, else_=values[0])
+
+
+# Built once from config and shared across the app
+grade_scale = GradeScale.from_config()
@@ -4,7 +4,8 @@ models/result.py - Result ORM model with auto grade/GPA calculation
 from datetime import datetime
 from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
-from config import Base, GRADE_SCALE
+from config import Base
+from models.grade_scale import grade_scale
 
 
 class Result(Base):
@@ -31,10 +32,7 @@ class Result(Base):
     @staticmethod
     def calculate_grade_gpa(marks: float):
         """Return (grade, gpa, remarks) for given marks."""
-        for low, high, grade, gpa, remarks in GRADE_SCALE:
-            if low <= marks <= high:
-                return grade, gpa, remarks
-        return "F", 0.0, "Fail"
+        return grade_scale.lookup(marks)
 
     def __repr__(self):
         return f"<Result student={self.student_id} subject={self.subject_id} marks={self.marks} grade={self.grade}>"
@@ -0,0 +1,17 @@
+"""
+models/schema_version.py - Applied schema migrations, one row per version
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime
+from config import Base
+
+
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(100), nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<SchemaVersion {self.version} {self.name}>"
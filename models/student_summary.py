@@ -0,0 +1,21 @@
+"""
+models/student_summary.py - Per-student results summary kept in step with results
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from config import Base
+
+
+class StudentSummary(Base):
+    __tablename__ = "student_summary"
+
+    student_id = Column(Integer, ForeignKey("students.id", ondelete="CASCADE"), primary_key=True)
+    total_marks = Column(Float, nullable=False, default=0)
+    result_count = Column(Integer, nullable=False, default=0)
+    avg_marks = Column(Float, nullable=False, default=0)
+    avg_gpa = Column(Float, nullable=False, default=0)
+    pass_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<StudentSummary student={self.student_id} count={self.result_count} avg={self.avg_marks}>"
@@ -6,3 +6,6 @@ from .result_service import ResultService
 from .teacher_service import TeacherService
 from .report_service import ReportService
 from .analytics_service import AnalyticsService
+from .import_service import ImportService
+from .summary_service import SummaryService
+from .session_manager import SessionManager
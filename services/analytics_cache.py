@@ -0,0 +1,71 @@
+"""
+services/analytics_cache.py - TTL + LRU cache for analytics aggregates
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from config import ANALYTICS_CACHE_TTL, ANALYTICS_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsCache:
+    """
+    Process-wide cache of computed analytics, keyed by (query, scope...).
+
+    Entries expire after ``ttl`` seconds and the least recently used entry is
+    evicted once ``maxsize`` is reached. Services that change marks or
+    students call ``invalidate()`` after committing, so a cached figure is
+    never older than the last write made through this process; the TTL
+    bounds staleness from writes made elsewhere (other workstations).
+    """
+
+    def __init__(self, ttl: float = ANALYTICS_CACHE_TTL, maxsize: int = ANALYTICS_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key``, calling ``compute()`` on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+        value = compute()
+        with self._lock:
+            # Drop the value if a write invalidated the cache while computing
+            if generation == self._generation and self.ttl > 0:
+                self._entries[key] = (time.monotonic(), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self):
+        """Forget every cached aggregate."""
+        with self._lock:
+            self._generation += 1
+            dropped = len(self._entries)
+            self._entries.clear()
+        if dropped:
+            logger.debug(f"Analytics cache invalidated ({dropped} entries)")
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "size": len(self._entries), "maxsize": self.maxsize, "ttl": self.ttl}
+
+
+# Shared by every dashboard in the process
+analytics_cache = AnalyticsCache()
@@ -2,85 +2,159 @@
 services/analytics_service.py - Analytics data computation
 """
 import logging
+from dataclasses import dataclass, field
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select, literal_column
+from config import PASS_MARK
 from models.result import Result
 from models.student import Student
 from models.subject import Subject
 from models.class_model import Class
+from models.student_summary import StudentSummary
+from services.session_manager import read_only
+from services.analytics_cache import analytics_cache
 
 logger = logging.getLogger(__name__)
 
+# Leaderboard length shown on the dashboards
+TOP_STUDENTS = 5
+
+
+@dataclass(frozen=True)
+class AnalyticsSnapshot:
+    """Every dashboard figure, computed together at one point in time."""
+    total_students: int = 0
+    total_results: int = 0
+    avg_marks: float = 0.0
+    pass_count: int = 0
+    fail_count: int = 0
+    class_averages: list = field(default_factory=list)    # [(class_name, avg_marks)]
+    subject_averages: list = field(default_factory=list)  # [(subject_name, avg_marks)]
+    top_students: list = field(default_factory=list)      # [(student_name, avg_marks)]
+    grade_counts: dict = field(default_factory=dict)      # {grade: count}
+
 
 class AnalyticsService:
     def __init__(self, db: Session):
         self.db = db
 
-    def class_average(self):
-        """Return list of (class_name, avg_marks)."""
-        rows = (
-            self.db.query(Class.class_name, func.avg(Result.marks).label("avg"))
-            .join(Student, Student.class_id == Class.id)
-            .join(Result, Result.student_id == Student.id)
-            .group_by(Class.class_name)
+    def snapshot(self, top: int = TOP_STUDENTS, class_id: int = None,
+                 academic_year: str = None) -> AnalyticsSnapshot:
+        """Return the dashboard figures for the school, a class or a year.
+
+        Served from ``analytics_cache`` when an unexpired entry exists for
+        the same scope; otherwise computed and cached.
+        """
+        key = ("snapshot", top, class_id, academic_year)
+        return analytics_cache.get_or_compute(
+            key, lambda: self._compute_snapshot(top, class_id, academic_year))
+
+    @staticmethod
+    def cache_stats() -> dict:
+        """Return the analytics cache hit/miss counters."""
+        return analytics_cache.stats()
+
+    @read_only
+    def _compute_snapshot(self, top, class_id, academic_year) -> AnalyticsSnapshot:
+        """Compute all dashboard figures in two statements.
+
+        One GROUPING SETS scan of results yields the per-class, per-subject
+        and per-grade rows plus the grand total (with the student count as a
+        scalar subquery); the leaderboard is read from student_summary.
+        """
+        scope = []
+        if class_id is not None:
+            scope.append(Student.class_id == class_id)
+        if academic_year is not None:
+            scope.append(Class.academic_year == academic_year)
+        student_count = (
+            select(func.count(Student.id))
+            .outerjoin(Class, Class.id == Student.class_id)
+            .where(*scope)
+            .correlate(None)
+            .scalar_subquery()
+        )
+        g_class = func.grouping(Class.class_name)
+        g_subject = func.grouping(Subject.subject_name)
+        g_grade = func.grouping(Result.grade)
+        stmt = (
+            select(
+                Class.class_name, Subject.subject_name, Result.grade,
+                g_class.label("g_class"), g_subject.label("g_subject"), g_grade.label("g_grade"),
+                func.count(Result.id).label("cnt"),
+                func.avg(Result.marks).label("avg"),
+                func.count(Result.id).filter(Result.marks >= PASS_MARK).label("passed"),
+                student_count.label("students"),
+            )
+            .select_from(Result)
+            .join(Student, Student.id == Result.student_id)
+            .join(Subject, Subject.id == Result.subject_id)
+            .outerjoin(Class, Class.id == Student.class_id)
+            .where(*scope)
+            .group_by(func.grouping_sets(
+                Class.class_name, Subject.subject_name, Result.grade, literal_column("()"),
+            ))
+        )
+        totals = None
+        classes, subjects, grades = [], [], {}
+        for r in self.db.execute(stmt):
+            if r.g_class and r.g_subject and r.g_grade:
+                totals = r
+            elif not r.g_class:
+                if r.class_name is not None:
+                    classes.append((r.class_name, round(r.avg, 2)))
+            elif not r.g_subject:
+                subjects.append((r.subject_name, round(r.avg, 2)))
+            else:
+                grades[r.grade] = r.cnt
+
+        leaders = (
+            self.db.query(Student.first_name, Student.last_name, StudentSummary.avg_marks)
+            .join(StudentSummary, StudentSummary.student_id == Student.id)
+            .outerjoin(Class, Class.id == Student.class_id)
+            .filter(StudentSummary.result_count > 0, *scope)
+            .order_by(StudentSummary.avg_marks.desc())
+            .limit(top)
             .all()
         )
-        return [(r.class_name, round(r.avg, 2)) for r in rows]
+        return AnalyticsSnapshot(
+            total_students=totals.students,
+            total_results=totals.cnt,
+            avg_marks=round(totals.avg or 0, 2),
+            pass_count=totals.passed,
+            fail_count=totals.cnt - totals.passed,
+            class_averages=sorted(classes),
+            subject_averages=sorted(subjects),
+            top_students=[(f"{r.first_name} {r.last_name}", round(r.avg_marks, 2)) for r in leaders],
+            grade_counts=grades,
+        )
+
+    def class_average(self):
+        """Return list of (class_name, avg_marks)."""
+        return self.snapshot().class_averages
 
     def subject_average(self):
         """Return list of (subject_name, avg_marks)."""
-        rows = (
-            self.db.query(Subject.subject_name, func.avg(Result.marks).label("avg"))
-            .join(Result, Result.subject_id == Subject.id)
-            .group_by(Subject.subject_name)
-            .all()
-        )
-        return [(r.subject_name, round(r.avg, 2)) for r in rows]
+        return self.snapshot().subject_averages
 
-    def top_students(self, limit: int = 5):
+    def top_students(self, limit: int = TOP_STUDENTS):
         """Return list of (student_name, avg_marks) top performers."""
-        rows = (
-            self.db.query(
-                Student.first_name,
-                Student.last_name,
-                func.avg(Result.marks).label("avg"),
-            )
-            .join(Result, Result.student_id == Student.id)
-            .group_by(Student.id, Student.first_name, Student.last_name)
-            .order_by(func.avg(Result.marks).desc())
-            .limit(limit)
-            .all()
-        )
-        return [(f"{r.first_name} {r.last_name}", round(r.avg, 2)) for r in rows]
+        return self.snapshot(top=limit).top_students
 
     def pass_fail_rate(self):
         """Return (pass_count, fail_count)."""
-        total = self.db.query(Result).count()
-        pass_count = self.db.query(Result).filter(Result.marks >= 50).count()
-        fail_count = total - pass_count
-        return pass_count, fail_count
+        snap = self.snapshot()
+        return snap.pass_count, snap.fail_count
 
     def gpa_distribution(self):
         """Return dict of grade -> count."""
-        rows = (
-            self.db.query(Result.grade, func.count(Result.id).label("cnt"))
-            .group_by(Result.grade)
-            .all()
-        )
-        return {r.grade: r.cnt for r in rows}
+        return self.snapshot().grade_counts
 
     def total_stats(self):
         """Return dict with overall stats."""
-        # Ensure session is fresh before query
-        try:
-            self.db.rollback()
-        except:
-            pass
-        total_students = self.db.query(Student).count()
-        total_results = self.db.query(Result).count()
-        avg_marks = self.db.query(func.avg(Result.marks)).scalar() or 0
+        snap = self.snapshot()
         return {
-            "total_students": total_students,
-            "total_results": total_results,
-            "avg_marks": round(avg_marks, 2),
+            "total_students": snap.total_students,
+            "total_results": snap.total_results,
+            "avg_marks": snap.avg_marks,
         }
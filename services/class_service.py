@@ -2,8 +2,10 @@
 services/class_service.py - Class CRUD service
 """
 import logging
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from models.class_model import Class
+from services.session_manager import read_only
+from services.analytics_cache import analytics_cache
 
 logger = logging.getLogger(__name__)
 
@@ -12,22 +14,26 @@ class ClassService:
     def __init__(self, db: Session):
         self.db = db
 
+    def _query(self):
+        # Objects outlive commits (expire_on_commit=False): refresh loaded rows
+        # and their counted collections, which other panels may have changed
+        return (self.db.query(Class)
+                .options(selectinload(Class.students), selectinload(Class.subjects))
+                .populate_existing())
+
+    @read_only
     def get_all(self):
-        # Ensure session is fresh before query
-        try:
-            self.db.rollback()
-        except:
-            pass
-        return self.db.query(Class).order_by(Class.class_name).all()
+        return self._query().order_by(Class.class_name).all()
 
     def get_by_id(self, class_id: int):
-        return self.db.query(Class).filter(Class.id == class_id).first()
+        return self._query().filter(Class.id == class_id).first()
 
     def create(self, class_name: str, academic_year: str) -> Class:
         cls = Class(class_name=class_name.strip(), academic_year=academic_year.strip())
         try:
             self.db.add(cls)
             self.db.commit()
+            analytics_cache.invalidate()
             self.db.refresh(cls)
             logger.info(f"Class created: {cls.class_name}")
             return cls
@@ -44,6 +50,7 @@ class ClassService:
         cls.academic_year = academic_year.strip()
         try:
             self.db.commit()
+            analytics_cache.invalidate()
             self.db.refresh(cls)
             return cls
         except Exception as e:
@@ -58,6 +65,7 @@ class ClassService:
         try:
             self.db.delete(cls)
             self.db.commit()
+            analytics_cache.invalidate()
             logger.info(f"Class deleted id={class_id}")
         except Exception as e:
             self.db.rollback()
@@ -0,0 +1,165 @@
+"""
+services/import_service.py - Bulk marks import (CSV -> results)
+"""
+import csv
+import logging
+import math
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from models.student import Student
+from models.subject import Subject
+from services.result_service import ResultService
+
+logger = logging.getLogger(__name__)
+
+# Rows per upsert batch / lookup IN (...) list
+BATCH_SIZE = 1000
+
+REQUIRED_COLUMNS = ("admission_number", "subject", "marks")
+
+
+class ImportService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def import_results_csv(self, filepath: str, overwrite: bool = False,
+                           allowed_subject_ids=None):
+        """Load a CSV of (admission_number, subject, marks) into results.
+
+        Admission numbers and subjects are resolved with set-based lookups and
+        all rows are written in one transaction by ResultService.upsert_many. A
+        subject name is matched to the subject of that name in the student's
+        class, or to the only subject with that name. Existing results are
+        left untouched unless ``overwrite`` is set. ``allowed_subject_ids``
+        restricts the import to those subjects (e.g. a teacher's own).
+
+        Returns a dict with inserted, updated and skipped counts and an
+        ``errors`` list of (line_no, admission_number, subject, message).
+        Bad rows are reported there instead of aborting the import.
+        """
+        errors = []
+        parsed = []
+        with open(filepath, newline="", encoding="utf-8-sig") as fh:
+            reader = csv.reader(fh)
+            header = [h.strip().lower().replace(" ", "_") for h in next(reader, [])]
+            missing = [c for c in REQUIRED_COLUMNS if c not in header]
+            if missing:
+                raise ValueError(f"CSV is missing required column(s): {', '.join(missing)}")
+            idx = [header.index(c) for c in REQUIRED_COLUMNS]
+            for line_no, row in enumerate(reader, start=2):
+                if not any(cell.strip() for cell in row):
+                    continue
+                try:
+                    adm, subject, raw_marks = (row[i].strip() for i in idx)
+                except IndexError:
+                    errors.append((line_no, "", "", "Row has too few columns."))
+                    continue
+                try:
+                    marks = float(raw_marks)
+                    if not math.isfinite(marks):
+                        raise ValueError(raw_marks)
+                except ValueError:
+                    errors.append((line_no, adm, subject, f"Invalid marks '{raw_marks}'."))
+                    continue
+                if marks < 0 or marks > 100:
+                    errors.append((line_no, adm, subject, "Marks must be between 0 and 100."))
+                    continue
+                if not adm or not subject:
+                    errors.append((line_no, adm, subject, "Admission number and subject are required."))
+                    continue
+                parsed.append((line_no, adm, subject, marks))
+
+        students = self._lookup_students({adm for _, adm, _, _ in parsed})
+        subjects_by_name = self._lookup_subjects({subj.lower() for _, _, subj, _ in parsed})
+        allowed = set(allowed_subject_ids) if allowed_subject_ids is not None else None
+
+        # Resolve ids; a later line for the same student/subject supersedes an earlier one
+        resolved = {}
+        for line_no, adm, subject, marks in parsed:
+            student = students.get(adm)
+            if not student:
+                errors.append((line_no, adm, subject, f"No student with admission number '{adm}'."))
+                continue
+            student_id, class_id = student
+            subject_id, message = self._resolve_subject(subjects_by_name.get(subject.lower(), []), class_id)
+            if message:
+                errors.append((line_no, adm, subject, message))
+                continue
+            if allowed is not None and subject_id not in allowed:
+                errors.append((line_no, adm, subject, "You are not assigned to this subject."))
+                continue
+            key = (student_id, subject_id)
+            if key in resolved:
+                prev_line = resolved[key][0]
+                errors.append((prev_line, adm, subject, f"Superseded by line {line_no}."))
+            resolved[key] = (line_no, adm, subject, marks)
+
+        written = ResultService(self.db).upsert_many(
+            [(sid, subj_id, marks) for (sid, subj_id), (_, _, _, marks) in resolved.items()],
+            overwrite=overwrite,
+            batch_size=BATCH_SIZE,
+        )
+        inserted = sum(1 for r in written if r.inserted)
+        updated = len(written) - inserted
+        skipped = 0
+        if not overwrite:
+            done = {(r.student_id, r.subject_id) for r in written}
+            for key, (line_no, adm, subject, _) in resolved.items():
+                if key not in done:
+                    skipped += 1
+                    errors.append((line_no, adm, subject, "Result already exists; not overwritten."))
+
+        errors.sort(key=lambda e: e[0])
+        logger.info(
+            f"Results imported from {filepath}: inserted={inserted} updated={updated} "
+            f"skipped={skipped} errors={len(errors)}"
+        )
+        return {"inserted": inserted, "updated": updated, "skipped": skipped, "errors": errors}
+
+    @staticmethod
+    def write_error_report(errors, filepath: str):
+        """Write the per-row error list returned by an import to CSV."""
+        with open(filepath, "w", newline="", encoding="utf-8") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(["Line", "Admission No", "Subject", "Error"])
+            writer.writerows(errors)
+        return filepath
+
+    def _lookup_students(self, admission_numbers):
+        """Return {admission_number: (student_id, class_id)}."""
+        found = {}
+        numbers = list(admission_numbers)
+        for start in range(0, len(numbers), BATCH_SIZE):
+            rows = (
+                self.db.query(Student.admission_number, Student.id, Student.class_id)
+                .filter(Student.admission_number.in_(numbers[start:start + BATCH_SIZE]))
+                .all()
+            )
+            found.update({r.admission_number: (r.id, r.class_id) for r in rows})
+        return found
+
+    def _lookup_subjects(self, names):
+        """Return {lower(subject_name): [(subject_id, class_id), ...]}."""
+        found = {}
+        if not names:
+            return found
+        rows = (
+            self.db.query(Subject.id, Subject.class_id, func.lower(Subject.subject_name).label("name"))
+            .filter(func.lower(Subject.subject_name).in_(list(names)))
+            .all()
+        )
+        for r in rows:
+            found.setdefault(r.name, []).append((r.id, r.class_id))
+        return found
+
+    @staticmethod
+    def _resolve_subject(candidates, class_id):
+        """Return (subject_id, None) or (None, error message)."""
+        if not candidates:
+            return None, "Unknown subject."
+        in_class = [sid for sid, cid in candidates if cid == class_id]
+        if len(in_class) == 1:
+            return in_class[0], None
+        if len(candidates) == 1:
+            return candidates[0][0], None
+        return None, "Subject name is ambiguous for this student's class."
@@ -1,170 +1,413 @@
 """
 services/report_service.py - PDF and CSV report generation
 """
+import csv
+import gzip
 import logging
+import multiprocessing
 import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
-import pandas as pd
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import cm
-from reportlab.platypus import (
-    SimpleDocTemplate, Table, TableStyle, Paragraph,
-    Spacer, HRFlowable
-)
+from urllib.parse import quote
 from sqlalchemy.orm import Session
+from sqlalchemy import func, select, text
 from models.result import Result
 from models.student import Student
 from models.subject import Subject
 from models.class_model import Class
+from models.student_summary import StudentSummary
+from models.grade_scale import grade_scale
+from config import REPORT_WORKERS
+from services.session_manager import read_only_transaction
 
 logger = logging.getLogger(__name__)
 
+# Roster rows fetched per round trip in class reports
+CLASS_REPORT_CHUNK = 500
+
+# Rows per fetch when streaming a CSV export without COPY
+EXPORT_CHUNK = 5000
+
+# Rows per Parquet row group (and per fetch from the server-side cursor)
+PARQUET_ROW_GROUP = 100_000
+PARQUET_PARTITION_COLUMNS = ("academic_year", "class_name")
+HIVE_NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+# Report cards handed to a worker process per task
+REPORT_CARD_CHUNK = 25
+
 
 class ReportService:
     def __init__(self, db: Session):
         self.db = db
 
-    def export_results_csv(self, filepath: str):
-        """Export all results to CSV."""
-        rows = (
-            self.db.query(
-                Student.admission_number,
-                (Student.first_name + " " + Student.last_name).label("student_name"),
-                Class.class_name,
-                Subject.subject_name,
-                Result.marks,
-                Result.grade,
-                Result.gpa,
-                Result.remarks,
+    def export_results_csv(self, filepath: str, class_id: int = None, subject_id: int = None,
+                           academic_year: str = None, compress: bool = None):
+        """Stream results to CSV, optionally filtered by class, subject or year.
+
+        On PostgreSQL the file is written by ``COPY (SELECT ...) TO STDOUT``;
+        elsewhere rows are streamed from a server-side cursor. Either way
+        memory stays flat however many results are exported. The file is
+        gzip-compressed when ``compress`` is set (default: path ends in .gz).
+        """
+        stmt = self._results_export_query(class_id, subject_id, academic_year)
+        if compress is None:
+            compress = filepath.endswith(".gz")
+        opener = gzip.open if compress else open
+        try:
+            with read_only_transaction(self.db), \
+                    opener(filepath, "wt", newline="", encoding="utf-8") as fh:
+                if self.db.get_bind().dialect.driver == "psycopg2":
+                    count = self._copy_to(stmt, fh)
+                else:
+                    count = self._stream_to(stmt, fh)
+        except Exception:
+            # Never leave a truncated export that looks complete
+            self._remove_partial(filepath)
+            raise
+        logger.info(f"CSV exported: {filepath} ({count} rows)")
+        return filepath
+
+    @staticmethod
+    def _results_export_query(class_id=None, subject_id=None, academic_year=None):
+        stmt = (
+            select(
+                Student.admission_number.label("Admission No"),
+                (Student.first_name + " " + Student.last_name).label("Student Name"),
+                Class.class_name.label("Class"),
+                Subject.subject_name.label("Subject"),
+                Result.marks.label("Marks"),
+                Result.grade.label("Grade"),
+                Result.gpa.label("GPA"),
+                Result.remarks.label("Remarks"),
             )
+            .select_from(Result)
             .join(Student, Result.student_id == Student.id)
             .outerjoin(Class, Student.class_id == Class.id)
             .join(Subject, Result.subject_id == Subject.id)
-            .all()
+            .order_by(Result.id)
         )
-        df = pd.DataFrame(rows, columns=[
-            "Admission No", "Student Name", "Class", "Subject",
-            "Marks", "Grade", "GPA", "Remarks"
-        ])
-        df.to_csv(filepath, index=False)
-        logger.info(f"CSV exported: {filepath}")
-        return filepath
+        if class_id is not None:
+            stmt = stmt.where(Student.class_id == class_id)
+        if subject_id is not None:
+            stmt = stmt.where(Result.subject_id == subject_id)
+        if academic_year is not None:
+            stmt = stmt.where(Class.academic_year == academic_year)
+        return stmt
+
+    def _copy_to(self, stmt, fh) -> int:
+        """Let the server format the CSV and stream it straight into ``fh``.
+
+        COPY is a single statement however many rows it writes, so the
+        profile's statement_timeout is lifted for this transaction only.
+        """
+        self.db.execute(text("SET LOCAL statement_timeout = 0"))
+        sql = str(stmt.compile(dialect=self.db.get_bind().dialect,
+                               compile_kwargs={"literal_binds": True}))
+        raw = self.db.connection().connection
+        with raw.cursor() as cur:
+            cur.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER)", fh)
+            return cur.rowcount
+
+    def _stream_to(self, stmt, fh) -> int:
+        """Fallback: write rows from a server-side cursor in EXPORT_CHUNK batches."""
+        writer = csv.writer(fh)
+        result = self.db.execute(stmt.execution_options(yield_per=EXPORT_CHUNK))
+        writer.writerow(result.keys())
+        count = 0
+        for chunk in result.partitions():
+            writer.writerows(chunk)
+            count += len(chunk)
+        return count
+
+    @staticmethod
+    def _remove_partial(*paths):
+        for partial in paths:
+            try:
+                os.remove(partial)
+                logger.warning(f"Removed partial export: {partial}")
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"Could not remove partial export {partial}: {e}")
+
+    def export_results_parquet(self, path: str, class_id: int = None, subject_id: int = None,
+                               academic_year: str = None, partition: bool = False,
+                               row_group_size: int = PARQUET_ROW_GROUP):
+        """Export results as Parquet for downstream analytics (requires pyarrow).
+
+        Rows come from a server-side cursor and are written in row groups of
+        ``row_group_size``, so memory stays bounded. Class, year, subject and
+        grade are dictionary-encoded. With ``partition`` set, ``path`` is a
+        directory laid out Hive-style as
+        ``academic_year=<year>/class_name=<class>/part-0.parquet``.
+
+        Returns the number of rows written. Files written by a failed export
+        are deleted.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet export needs the optional 'pyarrow' package (pip install pyarrow).")
+
+        dict_string = pa.dictionary(pa.int32(), pa.string())
+        # Same order as _results_parquet_query's columns
+        fields = [
+            ("academic_year", dict_string), ("class_name", dict_string),
+            ("admission_number", pa.string()), ("first_name", pa.string()),
+            ("last_name", pa.string()),
+            ("subject_name", dict_string), ("marks", pa.float64()), ("grade", dict_string),
+            ("gpa", pa.float64()), ("remarks", pa.string()),
+            ("created_at", pa.timestamp("us")), ("updated_at", pa.timestamp("us")),
+        ]
+        if partition:
+            # Partition values live in the directory names, not in the files
+            fields = [f for f in fields if f[0] not in PARQUET_PARTITION_COLUMNS]
+        schema = pa.schema(fields)
+        dict_columns = [name for name, kind in fields if kind == dict_string]
+
+        def to_table(rows):
+            columns = list(zip(*rows))
+            arrays = []
+            for (name, kind), values in zip(fields, columns):
+                if kind == dict_string:
+                    arrays.append(pa.array(values, pa.string()).dictionary_encode())
+                else:
+                    arrays.append(pa.array(values, kind))
+            return pa.Table.from_arrays(arrays, schema=schema)
+
+        stmt = self._results_parquet_query(class_id, subject_id, academic_year)
+        count, writer, current, buffer = 0, None, None, []
+        written = []  # files created so far, removed if the export fails
+        try:
+            with read_only_transaction(self.db):
+                result = self.db.execute(stmt.execution_options(yield_per=row_group_size))
+                try:
+                    for row in result:
+                        key = (row.academic_year, row.class_name) if partition else None
+                        if writer is None or key != current:
+                            if writer is not None:
+                                if buffer:
+                                    writer.write_table(to_table(buffer), row_group_size=row_group_size)
+                                writer.close()
+                            buffer, current = [], key
+                            target = self._parquet_partition_path(path, key) if partition else path
+                            written.append(target)
+                            writer = pq.ParquetWriter(target, schema, use_dictionary=dict_columns,
+                                                      compression="snappy")
+                        buffer.append(row[2:] if partition else row)
+                        count += 1
+                        if len(buffer) == row_group_size:
+                            writer.write_table(to_table(buffer), row_group_size=row_group_size)
+                            buffer = []
+                    if writer is None and not partition:
+                        written.append(path)
+                        writer = pq.ParquetWriter(path, schema, use_dictionary=dict_columns,
+                                                  compression="snappy")
+                    if writer is not None and buffer:
+                        writer.write_table(to_table(buffer), row_group_size=row_group_size)
+                finally:
+                    if writer is not None:
+                        writer.close()
+        except Exception:
+            self._remove_partial(*written)
+            raise
+        logger.info(f"Parquet exported: {path} ({count} rows{', partitioned' if partition else ''})")
+        return count
+
+    @staticmethod
+    def _results_parquet_query(class_id=None, subject_id=None, academic_year=None):
+        # Partition columns first and in sort order, so each partition is one contiguous run
+        stmt = (
+            select(
+                Class.academic_year, Class.class_name,
+                Student.admission_number, Student.first_name, Student.last_name,
+                Subject.subject_name, Result.marks, Result.grade, Result.gpa,
+                Result.remarks, Result.created_at, Result.updated_at,
+            )
+            .select_from(Result)
+            .join(Student, Result.student_id == Student.id)
+            .outerjoin(Class, Student.class_id == Class.id)
+            .join(Subject, Result.subject_id == Subject.id)
+            .order_by(Class.academic_year, Class.class_name, Result.id)
+        )
+        if class_id is not None:
+            stmt = stmt.where(Student.class_id == class_id)
+        if subject_id is not None:
+            stmt = stmt.where(Result.subject_id == subject_id)
+        if academic_year is not None:
+            stmt = stmt.where(Class.academic_year == academic_year)
+        return stmt
+
+    @staticmethod
+    def _parquet_partition_path(root, key):
+        parts = [
+            f"{column}={quote(value, safe='') if value is not None else HIVE_NULL_PARTITION}"
+            for column, value in zip(PARQUET_PARTITION_COLUMNS, key)
+        ]
+        directory = os.path.join(root, *parts)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, "part-0.parquet")
 
     def generate_student_report_card(self, student_id: int, filepath: str):
         """Generate PDF report card for a single student."""
-        student = self.db.query(Student).filter(Student.id == student_id).first()
-        if not student:
+        cards = self._report_card_data(Student.id == student_id)
+        if not cards:
             raise ValueError("Student not found.")
+        # ReportLab is only loaded once a PDF is actually requested
+        from utils.report_card_pdf import render_report_card
+        render_report_card(cards[0], filepath)
+        logger.info(f"Report card generated: {filepath}")
+        return filepath
+
+    def _report_card_data(self, *criteria):
+        """Prefetch report card data for every student matching ``criteria``.
 
+        Two queries regardless of the number of students: the roster (with
+        class names) and all of their results. Returns plain, picklable dicts
+        in the shape ``render_report_card`` expects.
+        """
+        students = (
+            self.db.query(
+                Student.id, Student.admission_number, Student.first_name, Student.last_name,
+                Student.gender, Student.date_of_birth, Class.class_name,
+            )
+            .outerjoin(Class, Student.class_id == Class.id)
+            .filter(*criteria)
+            .order_by(Class.class_name, Student.first_name, Student.id)
+            .all()
+        )
+        today = datetime.now().strftime("%Y-%m-%d")
+        cards = {}
+        for s in students:
+            cards[s.id] = {
+                "student_id": s.id,
+                "student_name": f"{s.first_name} {s.last_name}",
+                "admission_number": s.admission_number,
+                "class_name": s.class_name,
+                "gender": s.gender,
+                "date_of_birth": s.date_of_birth,
+                "date_generated": today,
+                "results": [],
+            }
+        if not cards:
+            return []
         results = (
-            self.db.query(Result, Subject.subject_name)
+            self.db.query(Result.student_id, Subject.subject_name, Result.marks,
+                          Result.grade, Result.gpa, Result.remarks)
             .join(Subject, Result.subject_id == Subject.id)
-            .filter(Result.student_id == student_id)
+            .join(Student, Result.student_id == Student.id)
+            .outerjoin(Class, Student.class_id == Class.id)
+            .filter(*criteria)
+            .order_by(Result.student_id, Result.id)
             .all()
         )
+        for r in results:
+            cards[r.student_id]["results"].append((r.subject_name, r.marks, r.grade, r.gpa, r.remarks))
+        return list(cards.values())
 
-        doc = SimpleDocTemplate(
-            filepath, pagesize=A4,
-            topMargin=1.5*cm, bottomMargin=1.5*cm,
-            leftMargin=2*cm, rightMargin=2*cm,
-        )
-        styles = getSampleStyleSheet()
-        story = []
+    def generate_report_cards(self, output: str, class_id: int = None,
+                              academic_year: str = None, workers: int = None,
+                              as_zip: bool = False):
+        """Generate report cards for a class, an academic year or the whole school.
 
-        # Header
-        title_style = ParagraphStyle(
-            "Title", parent=styles["Title"],
-            fontSize=18, textColor=colors.HexColor("#1a237e"),
-            spaceAfter=6,
-        )
-        sub_style = ParagraphStyle(
-            "Sub", parent=styles["Normal"],
-            fontSize=11, textColor=colors.HexColor("#555555"),
-            spaceAfter=4, alignment=1,
-        )
-        story.append(Paragraph("SCHOOL EXAMINATION RESULTS", title_style))
-        story.append(Paragraph("Student Report Card", sub_style))
-        story.append(HRFlowable(width="100%", thickness=2, color=colors.HexColor("#1a237e")))
-        story.append(Spacer(1, 0.4*cm))
-
-        # Student info
-        class_name = student.class_.class_name if student.class_ else "N/A"
-        info_data = [
-            ["Student Name:", student.full_name, "Admission No:", student.admission_number],
-            ["Class:", class_name, "Gender:", student.gender],
-            ["Date of Birth:", str(student.date_of_birth or "N/A"), "Date Generated:", datetime.now().strftime("%Y-%m-%d")],
-        ]
-        info_table = Table(info_data, colWidths=[3.5*cm, 5*cm, 3.5*cm, 5*cm])
-        info_table.setStyle(TableStyle([
-            ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-            ("FONTNAME", (2, 0), (2, -1), "Helvetica-Bold"),
-            ("FONTSIZE", (0, 0), (-1, -1), 10),
-            ("TOPPADDING", (0, 0), (-1, -1), 3),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
-        ]))
-        story.append(info_table)
-        story.append(Spacer(1, 0.5*cm))
+        Data is prefetched in two bulk queries and the PDFs are rendered in
+        chunks across a ProcessPoolExecutor (``workers`` processes, default
+        REPORT_WORKERS or the CPU count). Cards are written into the directory
+        ``output``, or into the zip file ``output`` when ``as_zip`` is set.
 
-        # Results table
-        table_data = [["#", "Subject", "Marks", "Grade", "GPA", "Remarks"]]
-        total_marks = 0
-        total_gpa = 0
-        for i, (result, subject_name) in enumerate(results, 1):
-            table_data.append([
-                str(i), subject_name,
-                f"{result.marks:.1f}", result.grade,
-                f"{result.gpa:.1f}", result.remarks,
-            ])
-            total_marks += result.marks
-            total_gpa += result.gpa
+        Returns a dict with generated, failed [(admission_number, message)],
+        seconds and cards_per_second.
+        """
+        criteria = []
+        if class_id is not None:
+            criteria.append(Student.class_id == class_id)
+        if academic_year is not None:
+            criteria.append(Class.academic_year == academic_year)
 
-        if results:
-            avg_marks = total_marks / len(results)
-            avg_gpa = total_gpa / len(results)
-            table_data.append(["", "AVERAGE", f"{avg_marks:.1f}", "", f"{avg_gpa:.2f}", ""])
+        started = time.perf_counter()
+        cards = self._report_card_data(*criteria)
+        if not cards:
+            raise ValueError("No students found for the selected scope.")
+        workers = workers or REPORT_WORKERS or os.cpu_count() or 1
+        chunks = [cards[i:i + REPORT_CARD_CHUNK] for i in range(0, len(cards), REPORT_CARD_CHUNK)]
+        from utils.report_card_pdf import render_card_batch
 
-        t = Table(table_data, colWidths=[1*cm, 5*cm, 2.5*cm, 2*cm, 2*cm, 4*cm])
-        t.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1a237e")),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("FONTSIZE", (0, 0), (-1, -1), 9),
-            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-            ("ALIGN", (1, 0), (1, -1), "LEFT"),
-            ("ROWBACKGROUNDS", (0, 1), (-1, -2), [colors.HexColor("#f5f5f5"), colors.white]),
-            ("BACKGROUND", (0, -1), (-1, -1), colors.HexColor("#e8eaf6")),
-            ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#cccccc")),
-            ("TOPPADDING", (0, 0), (-1, -1), 4),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-        ]))
-        story.append(t)
-        story.append(Spacer(1, 1*cm))
-        story.append(Paragraph(
-            "This report card was generated automatically by the School Examination Results Management System.",
-            ParagraphStyle("footer", parent=styles["Normal"], fontSize=8,
-                           textColor=colors.grey, alignment=1)
-        ))
+        generated, failed = 0, []
+        if as_zip:
+            sink = zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED)
+        else:
+            os.makedirs(output, exist_ok=True)
+            sink = None
+        try:
+            # spawn: a forked worker would inherit the pool's open sockets and Tk state
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context("spawn")) as pool:
+                futures = {pool.submit(render_card_batch, chunk): chunk for chunk in chunks}
+                for future in as_completed(futures):
+                    try:
+                        rendered = future.result()
+                    except Exception as e:
+                        # The worker itself died; every card of its chunk failed
+                        failed.extend((c["admission_number"], str(e)) for c in futures[future])
+                        continue
+                    for adm, filename, pdf, error in rendered:
+                        if error:
+                            failed.append((adm, error))
+                            continue
+                        if sink:
+                            sink.writestr(filename, pdf)
+                        else:
+                            with open(os.path.join(output, filename), "wb") as fh:
+                                fh.write(pdf)
+                        generated += 1
+        finally:
+            if sink:
+                sink.close()
 
-        doc.build(story)
-        logger.info(f"Report card generated: {filepath}")
-        return filepath
+        seconds = time.perf_counter() - started
+        rate = generated / seconds if seconds else 0.0
+        for adm, error in failed:
+            logger.error(f"Report card failed for {adm}: {error}")
+        logger.info(
+            f"Report cards generated: {generated} ok, {len(failed)} failed in {seconds:.1f}s "
+            f"({rate:.1f} cards/s, {workers} workers) -> {output}"
+        )
+        return {"generated": generated, "failed": failed,
+                "seconds": seconds, "cards_per_second": rate}
 
     def generate_class_report_pdf(self, class_id: int, filepath: str):
-        """Generate PDF report for an entire class."""
+        """Generate PDF report for an entire class.
+
+        The roster is fetched CLASS_REPORT_CHUNK rows at a time, but ReportLab
+        lays out a table only once all of its rows are known, so memory grows
+        with the class size: one short row of text per student, in a single
+        LongTable whose header repeats at the top of each page.
+        """
         cls = self.db.query(Class).filter(Class.id == class_id).first()
         if not cls:
             raise ValueError("Class not found.")
 
-        students = (
-            self.db.query(Student)
+        rows = (
+            self.db.query(
+                Student.admission_number, Student.first_name, Student.last_name,
+                func.coalesce(StudentSummary.result_count, 0).label("result_count"),
+                StudentSummary.avg_marks, StudentSummary.avg_gpa,
+            )
+            .outerjoin(StudentSummary, StudentSummary.student_id == Student.id)
             .filter(Student.class_id == class_id)
-            .order_by(Student.first_name)
-            .all()
+            .order_by(Student.first_name, Student.id)
+            .yield_per(CLASS_REPORT_CHUNK)
         )
 
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib import colors
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import cm
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, HRFlowable
         doc = SimpleDocTemplate(filepath, pagesize=A4,
                                 topMargin=1.5*cm, bottomMargin=1.5*cm,
                                 leftMargin=2*cm, rightMargin=2*cm)
@@ -180,26 +423,36 @@ class ReportService:
         story.append(HRFlowable(width="100%", thickness=1.5, color=colors.HexColor("#1a237e")))
         story.append(Spacer(1, 0.5*cm))
 
-        table_data = [["Adm No", "Student Name", "Subjects", "Avg Marks", "Avg GPA", "Div"]]
-        for student in students:
-            results = self.db.query(Result).filter(Result.student_id == student.id).all()
-            if results:
-                avg_marks = sum(r.marks for r in results) / len(results)
-                avg_gpa = sum(r.gpa for r in results) / len(results)
-                _, _, remarks = Result.calculate_grade_gpa(avg_marks)
+        header = ["Adm No", "Student Name", "Subjects", "Avg Marks", "Avg GPA", "Div"]
+        table_rows = []
+        for r in rows:
+            if r.result_count:
+                avg_marks, avg_gpa = r.avg_marks, r.avg_gpa
+                _, _, remarks = grade_scale.lookup(avg_marks)
             else:
                 avg_marks = avg_gpa = 0
                 remarks = "N/A"
-            table_data.append([
-                student.admission_number,
-                student.full_name,
-                str(len(results)),
+            table_rows.append([
+                r.admission_number,
+                f"{r.first_name} {r.last_name}",
+                str(r.result_count),
                 f"{avg_marks:.1f}",
                 f"{avg_gpa:.2f}",
                 remarks,
             ])
+        story.append(self._class_report_table(header, table_rows))
+        doc.build(story)
+        logger.info(f"Class report generated: {filepath}")
+        return filepath
 
-        t = Table(table_data, colWidths=[2.5*cm, 5*cm, 2*cm, 2.5*cm, 2.5*cm, 3*cm])
+    @staticmethod
+    def _class_report_table(header, rows):
+        """LongTable for the class roster, header repeated on each page."""
+        from reportlab.lib import colors
+        from reportlab.lib.units import cm
+        from reportlab.platypus import LongTable, TableStyle
+        t = LongTable([header] + rows, colWidths=[2.5*cm, 5*cm, 2*cm, 2.5*cm, 2.5*cm, 3*cm],
+                      repeatRows=1)
         t.setStyle(TableStyle([
             ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1a237e")),
             ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
@@ -212,7 +465,4 @@ class ReportService:
             ("TOPPADDING", (0, 0), (-1, -1), 4),
             ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
         ]))
-        story.append(t)
-        doc.build(story)
-        logger.info(f"Class report generated: {filepath}")
-        return filepath
+        return t
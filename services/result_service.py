@@ -2,32 +2,117 @@
 services/result_service.py - Result CRUD service
 """
 import logging
-from sqlalchemy.orm import Session
+import math
+from datetime import datetime
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import update, literal_column, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from models.result import Result
+from models.grade_scale import grade_scale
+from models.student import Student
+from models.subject import Subject
+from models.class_model import Class
+from services.session_manager import read_only
+from services.analytics_cache import analytics_cache
+from services.summary_service import SummaryService
 
 logger = logging.getLogger(__name__)
 
+# The class a subject is taught in, next to the student's own class
+SubjectClass = aliased(Class, name="subject_class")
+
+# Rows per INSERT ... ON CONFLICT statement in upsert_many
+UPSERT_BATCH_SIZE = 1000
+
+RETURNED_COLUMNS = (
+    Result.id, Result.student_id, Result.subject_id,
+    Result.marks, Result.grade, Result.gpa, Result.remarks,
+)
+
 
 class ResultService:
     def __init__(self, db: Session):
         self.db = db
 
+    @read_only
     def get_all(self):
-        # Ensure session is fresh before query
-        try:
-            self.db.rollback()
-        except:
-            pass
         return self.db.query(Result).all()
 
+    def _rows_query(self):
+        return (
+            self.db.query(
+                Result.id,
+                Result.student_id,
+                Result.subject_id,
+                Student.admission_number,
+                (Student.first_name + " " + Student.last_name).label("student_name"),
+                Class.class_name,
+                Subject.subject_name,
+                SubjectClass.class_name.label("subject_class_name"),
+                Result.marks,
+                Result.grade,
+                Result.gpa,
+                Result.remarks,
+            )
+            .join(Student, Result.student_id == Student.id)
+            .outerjoin(Class, Student.class_id == Class.id)
+            .join(Subject, Result.subject_id == Subject.id)
+            .outerjoin(SubjectClass, Subject.class_id == SubjectClass.id)
+        )
+
+    @staticmethod
+    def _scoped(q, class_id=None, student_id=None, subject_ids=None):
+        if class_id:
+            q = q.filter(Student.class_id == class_id)
+        if student_id:
+            q = q.filter(Result.student_id == student_id)
+        if subject_ids is not None:
+            q = q.filter(Result.subject_id.in_(list(subject_ids)))
+        return q
+
+    @read_only
+    def list_rows(self, class_id: int = None, student_id: int = None, subject_ids=None):
+        """Return flat, fully joined result rows in a single query.
+
+        Each row exposes id, student_id, subject_id, admission_number,
+        student_name, class_name (the student's class), subject_name,
+        subject_class_name (the subject's class), marks, grade, gpa and
+        remarks, so tables can render without lazy-loading related objects
+        per row.
+        """
+        q = self._scoped(self._rows_query(), class_id, student_id, subject_ids)
+        return q.order_by(Result.id).all()
+
+    @read_only
+    def list_ids(self, class_id: int = None, student_id: int = None, subject_ids=None):
+        """Return the ids of the results ``list_rows`` would return, in the same order.
+
+        Large tables hold just this list and fetch rows with ``rows_by_ids``
+        as they scroll into view.
+        """
+        q = self.db.query(Result.id)
+        if class_id:
+            q = q.join(Student, Result.student_id == Student.id)
+        q = self._scoped(q, class_id, student_id, subject_ids)
+        return [r.id for r in q.order_by(Result.id)]
+
+    @read_only
+    def rows_by_ids(self, ids):
+        """Return ``list_rows``-style rows for the given result ids, in that order."""
+        ids = list(ids)
+        if not ids:
+            return []
+        rows = {r.id: r for r in self._rows_query().filter(Result.id.in_(ids))}
+        return [rows[i] for i in ids if i in rows]
+
     def get_by_id(self, result_id: int):
-        return self.db.query(Result).filter(Result.id == result_id).first()
+        return self.db.query(Result).populate_existing().filter(Result.id == result_id).first()
 
     def get_by_student(self, student_id: int):
-        return self.db.query(Result).filter(Result.student_id == student_id).all()
+        return self.db.query(Result).populate_existing().filter(Result.student_id == student_id).all()
 
     def get_by_subject(self, subject_id: int):
-        return self.db.query(Result).filter(Result.subject_id == subject_id).all()
+        return self.db.query(Result).populate_existing().filter(Result.subject_id == subject_id).all()
 
     def exists(self, student_id: int, subject_id: int):
         return self.db.query(Result).filter(
@@ -35,67 +120,174 @@ class ResultService:
             Result.subject_id == subject_id,
         ).first()
 
-    def add_result(self, student_id: int, subject_id: int, marks: float) -> Result:
-        if marks < 0 or marks > 100:
+    def _expire_loaded(self, result_ids=None):
+        """Expire Result objects already loaded that a Core statement rewrote.
+
+        Loaded objects survive commits (expire_on_commit=False) and Core
+        UPDATE/INSERT statements bypass the identity map; ``None`` expires
+        every loaded result.
+        """
+        if result_ids is None:
+            stale = [obj for obj in self.db.identity_map.values() if isinstance(obj, Result)]
+        else:
+            stale = [self.db.identity_map.get(self.db.identity_key(Result, i)) for i in result_ids]
+        for obj in stale:
+            if obj is not None:
+                self.db.expire(obj)
+
+    @staticmethod
+    def _validate_marks(marks: float):
+        if not math.isfinite(marks) or not 0 <= marks <= 100:
             raise ValueError("Marks must be between 0 and 100.")
-        if self.exists(student_id, subject_id):
+
+    def upsert_many(self, rows, overwrite: bool = True, batch_size: int = UPSERT_BATCH_SIZE):
+        """Insert or update many marks in batches keyed on uq_student_subject.
+
+        ``rows`` is an iterable of (student_id, subject_id, marks); a later
+        row for the same student and subject wins. Each batch is a single
+        INSERT ... ON CONFLICT (student_id, subject_id) statement. When
+        ``overwrite`` is False existing marks are left as they are and are not
+        returned. All batches are committed as one transaction.
+
+        Returns the written rows (id, student_id, subject_id, marks, grade,
+        gpa, remarks, inserted) via RETURNING.
+        """
+        latest = {}
+        for student_id, subject_id, marks in rows:
+            self._validate_marks(marks)
+            latest[(student_id, subject_id)] = marks
+        keys = list(latest)
+        marks_list = [latest[k] for k in keys]
+        grades, gpas, remarks = grade_scale.grade_many(marks_list) if keys else ([], [], [])
+
+        now = datetime.utcnow()
+        payload = [
+            {
+                "student_id": student_id, "subject_id": subject_id, "marks": marks,
+                "grade": grade, "gpa": float(gpa), "remarks": remark,
+                "created_at": now, "updated_at": now,
+            }
+            for (student_id, subject_id), marks, grade, gpa, remark
+            in zip(keys, marks_list, grades, gpas, remarks)
+        ]
+
+        written = []
+        try:
+            for start in range(0, len(payload), batch_size):
+                stmt = pg_insert(Result.__table__).values(payload[start:start + batch_size])
+                if overwrite:
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=["student_id", "subject_id"],
+                        set_={
+                            "marks": stmt.excluded.marks,
+                            "grade": stmt.excluded.grade,
+                            "gpa": stmt.excluded.gpa,
+                            "remarks": stmt.excluded.remarks,
+                            "updated_at": stmt.excluded.updated_at,
+                        },
+                    )
+                else:
+                    stmt = stmt.on_conflict_do_nothing(index_elements=["student_id", "subject_id"])
+                # xmax is 0 only for tuples created by this statement
+                stmt = stmt.returning(*RETURNED_COLUMNS, literal_column("(xmax = 0)").label("inserted"))
+                written.extend(self.db.execute(stmt).all())
+            SummaryService(self.db).refresh(r.student_id for r in written)
+            self.db.commit()
+            self._expire_loaded(r.id for r in written)
+            analytics_cache.invalidate()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error upserting results: {e}")
+            raise
+        return written
+
+    def add_result(self, student_id: int, subject_id: int, marks: float):
+        """Add a single mark; returns the written row."""
+        written = self.upsert_many([(student_id, subject_id, marks)], overwrite=False)
+        if not written:
             raise ValueError("Result for this student and subject already exists. Use update instead.")
-        grade, gpa, remarks = Result.calculate_grade_gpa(marks)
-        result = Result(
-            student_id=student_id,
-            subject_id=subject_id,
-            marks=marks,
-            grade=grade,
-            gpa=gpa,
-            remarks=remarks,
+        result = written[0]
+        logger.info(f"Result added: student={student_id} subject={subject_id} marks={marks} grade={result.grade}")
+        return result
+
+    def update_result(self, result_id: int, marks: float):
+        """Change the marks of an existing result; returns the written row."""
+        self._validate_marks(marks)
+        grade, gpa, remarks = grade_scale.lookup(marks)
+        stmt = (
+            update(Result.__table__)
+            .where(Result.id == result_id)
+            .values(marks=marks, grade=grade, gpa=gpa, remarks=remarks,
+                    updated_at=datetime.utcnow())
+            .returning(*RETURNED_COLUMNS)
         )
         try:
-            self.db.add(result)
+            result = self.db.execute(stmt).first()
+            if result:
+                SummaryService(self.db).refresh([result.student_id])
             self.db.commit()
-            self.db.refresh(result)
-            logger.info(f"Result added: student={student_id} subject={subject_id} marks={marks} grade={grade}")
-            return result
+            if result:
+                self._expire_loaded([result.id])
+            analytics_cache.invalidate()
         except Exception as e:
             self.db.rollback()
-            logger.error(f"Error adding result: {e}")
+            logger.error(f"Error updating result: {e}")
             raise
-
-    def update_result(self, result_id: int, marks: float) -> Result:
-        if marks < 0 or marks > 100:
-            raise ValueError("Marks must be between 0 and 100.")
-        result = self.get_by_id(result_id)
         if not result:
             raise ValueError("Result not found.")
-        grade, gpa, remarks = Result.calculate_grade_gpa(marks)
-        result.marks = marks
-        result.grade = grade
-        result.gpa = gpa
-        result.remarks = remarks
+        return result
+
+    def regrade_all(self) -> int:
+        """Recompute grade, gpa and remarks of every result from the grade scale.
+
+        Runs as one UPDATE using CASE expressions compiled from the shared
+        scale and only touches rows whose stored grade is out of date.
+        Returns the number of rows changed.
+        """
+        grade = grade_scale.sql_case(Result.marks, "grade")
+        gpa = grade_scale.sql_case(Result.marks, "gpa")
+        remarks = grade_scale.sql_case(Result.marks, "remarks")
+        stmt = (
+            update(Result.__table__)
+            .where(or_(Result.grade != grade, Result.gpa != gpa, Result.remarks != remarks))
+            .values(grade=grade, gpa=gpa, remarks=remarks, updated_at=datetime.utcnow())
+        )
         try:
+            changed = self.db.execute(stmt).rowcount
+            if changed:
+                # GPAs moved, so any student's average GPA may be stale
+                SummaryService(self.db).refresh()
             self.db.commit()
-            self.db.refresh(result)
-            return result
+            if changed:
+                self._expire_loaded()
+            analytics_cache.invalidate()
+            logger.info(f"Results regraded: {changed} row(s) changed")
+            return changed
         except Exception as e:
             self.db.rollback()
-            logger.error(f"Error updating result: {e}")
+            logger.error(f"Error regrading results: {e}")
             raise
 
     def delete_result(self, result_id: int):
         result = self.get_by_id(result_id)
         if not result:
             raise ValueError("Result not found.")
+        student_id = result.student_id
         try:
             self.db.delete(result)
+            self.db.flush()
+            SummaryService(self.db).refresh([student_id])
             self.db.commit()
+            analytics_cache.invalidate()
             logger.info(f"Result deleted id={result_id}")
         except Exception as e:
             self.db.rollback()
             logger.error(f"Error deleting result: {e}")
             raise
 
+    @read_only
     def get_class_results(self, class_id: int):
         """Get all results for students in a class."""
-        from models.student import Student
         return (
             self.db.query(Result)
             .join(Student, Result.student_id == Student.id)
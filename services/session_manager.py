@@ -0,0 +1,305 @@
+"""
+services/session_manager.py - Per-dashboard session scope and connection-leak tracking
+"""
+import functools
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.sql.dml import Insert, Update, Delete
+from config import engine
+
+logger = logging.getLogger(__name__)
+
+# Connections held longer than this (seconds) are reported as leaked
+LEAK_THRESHOLD = 60.0
+
+# Frames of the checkout call stack kept for leak reports
+LEAK_STACK_DEPTH = 10
+
+
+class ConnectionTracker:
+    """Records pooled connections that are checked out and not yet returned.
+
+    Checkout records only (file, line, function) for the calling frames; the
+    source lines are looked up and formatted when a leak is reported.
+    """
+
+    def __init__(self, bind):
+        self._lock = threading.Lock()
+        self._checked_out = {}
+        event.listen(bind, "checkout", self._on_checkout)
+        event.listen(bind, "checkin", self._on_checkin)
+
+    def _on_checkout(self, dbapi_conn, record, proxy):
+        stack = []
+        frame = sys._getframe(1)
+        while frame is not None and len(stack) < LEAK_STACK_DEPTH:
+            stack.append((frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name, None))
+            frame = frame.f_back
+        with self._lock:
+            self._checked_out[id(record)] = (time.monotonic(), threading.current_thread().name, stack)
+
+    def _on_checkin(self, dbapi_conn, record):
+        with self._lock:
+            self._checked_out.pop(id(record), None)
+
+    def checked_out(self) -> int:
+        """Return the number of connections currently checked out of the pool."""
+        with self._lock:
+            return len(self._checked_out)
+
+    def report_leaks(self, older_than: float = LEAK_THRESHOLD) -> int:
+        """Log every connection checked out for longer than ``older_than`` seconds."""
+        now = time.monotonic()
+        with self._lock:
+            held = [v for v in self._checked_out.values() if now - v[0] >= older_than]
+        for since, thread_name, stack in held:
+            formatted = "".join(traceback.StackSummary.from_list(reversed(stack)).format())
+            logger.warning(
+                f"Connection checked out for {now - since:.0f}s by thread {thread_name} "
+                f"and never returned. Checked out at:\n{formatted}"
+            )
+        return len(held)
+
+
+@contextmanager
+def read_only_transaction(db):
+    """Run a block of reads in its own short READ ONLY transaction.
+
+    When the session is already inside a transaction (for example the
+    lookups of a write in progress) the reads simply join it. Otherwise a
+    read-only transaction is begun, committed when the block exits and
+    rolled back only if the block raised, so the connection goes straight
+    back to the pool and loaded objects are not expired.
+    """
+    if db.in_transaction():
+        yield db
+        return
+    if db.get_bind().dialect.name == "postgresql":
+        db.connection(execution_options={"postgresql_readonly": True})
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def read_only(method):
+    """Decorator running a service method in ``read_only_transaction(self.db)``."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with read_only_transaction(self.db):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+_tracker = None
+
+
+def connection_tracker() -> ConnectionTracker:
+    """Return the process-wide tracker for the application engine."""
+    global _tracker
+    if _tracker is None:
+        _tracker = ConnectionTracker(engine)
+    return _tracker
+
+
+class DataChanges:
+    """
+    Per-table change counters for the process.
+
+    Every committed transaction of a ``SessionManager`` session bumps the
+    counter of each table it wrote, whether through the unit of work or a
+    bulk insert/update/delete statement. Views compare ``version(tables)``
+    before and after to tell whether data they show has changed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._total = 0
+
+    def notify(self, tables):
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+                self._total += 1
+
+    def version(self, tables=None) -> int:
+        """Return a number that grows whenever any of ``tables`` (default: any table) changes."""
+        with self._lock:
+            if tables is None:
+                return self._total
+            return sum(self._versions.get(table, 0) for table in tables)
+
+
+data_changes = DataChanges()
+
+
+# Open session scopes, so worker threads can release whatever they used
+_scopes = weakref.WeakSet()
+# Closed scopes kept alive until their background sessions have been released
+_closing = set()
+
+
+def release_thread_sessions():
+    """End and discard the calling thread's session in every open scope.
+
+    Background tasks call this when they finish so their connection goes
+    back to the pool instead of waiting on a thread that may sit idle.
+    """
+    for scope in list(_scopes):
+        scope.release_thread()
+
+
+class SessionManager:
+    """
+    Session scope for one dashboard.
+
+    All services of a dashboard share ``self.session``, a scoped session
+    proxy. Every UI action runs in its own short transaction: the first query
+    of an action schedules ``end_action`` (via ``schedule``, e.g. Tk's
+    ``after_idle``), which ends the transaction and returns the connection to
+    the pool once the action has finished. Objects are not expired at commit,
+    so already loaded rows stay usable between actions. ``close`` discards the
+    session and is called on logout.
+
+    ``self.session`` is thread-local: work run on a background thread gets its
+    own session, which ``release_thread`` ends when the task is done.
+    """
+
+    def __init__(self, schedule=None, bind=engine):
+        self._factory = sessionmaker(bind=bind, autocommit=False, autoflush=False,
+                                     expire_on_commit=False)
+        self.session = scoped_session(self._factory)
+        self._schedule = schedule
+        self._release_pending = False
+        self._closed = False
+        self._lock = threading.Lock()
+        self._workers = set()  # background threads holding a session of this scope
+        connection_tracker()
+        event.listen(self._factory, "after_begin", self._on_begin)
+        event.listen(self._factory, "after_flush", self._on_flush)
+        event.listen(self._factory, "do_orm_execute", self._on_execute)
+        event.listen(self._factory, "after_commit", self._on_commit)
+        event.listen(self._factory, "after_rollback", self._on_rollback)
+        _scopes.add(self)
+
+    def _on_begin(self, session, transaction, connection):
+        # Only the UI thread's transactions are ended by the scheduler
+        if threading.current_thread() is not threading.main_thread():
+            with self._lock:
+                self._workers.add(threading.get_ident())
+            return
+        if self._schedule and not self._release_pending:
+            self._release_pending = True
+            self._schedule(self.end_action)
+
+    @staticmethod
+    def _on_flush(session, flush_context):
+        # new/dirty/deleted still hold the pre-flush state here
+        changed = session.info.setdefault("changed_tables", set())
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            changed.add(obj.__table__.name)
+
+    @staticmethod
+    def _on_execute(state):
+        if isinstance(state.statement, (Insert, Update, Delete)):
+            state.session.info.setdefault("changed_tables", set()).add(state.statement.table.name)
+
+    @staticmethod
+    def _on_commit(session):
+        changed = session.info.pop("changed_tables", None)
+        if changed:
+            data_changes.notify(changed)
+
+    @staticmethod
+    def _on_rollback(session):
+        session.info.pop("changed_tables", None)
+
+    def end_action(self):
+        """End the current transaction and return its connection to the pool."""
+        self._release_pending = False
+        if self._closed or not self.session.registry.has():
+            return
+        session = self.session()
+        if not session.in_transaction():
+            return
+        try:
+            if session.new or session.dirty or session.deleted:
+                logger.warning("Discarding uncommitted changes left at the end of an action.")
+                session.rollback()
+            else:
+                session.commit()
+        except Exception as e:
+            logger.error(f"Error ending session transaction: {e}")
+            session.rollback()
+
+    def release_thread(self):
+        """End the calling thread's transaction and discard its session.
+
+        Also runs after ``close``: a task that was already running at logout
+        still hands its connection back when it finishes.
+        """
+        try:
+            if self.session.registry.has():
+                self._end_thread_session()
+        finally:
+            with self._lock:
+                self._workers.discard(threading.get_ident())
+                finished = self._closed and not self._workers and self in _closing
+                _closing.discard(self)
+            if finished:
+                self._finish_close()
+
+    def _end_thread_session(self):
+        session = self.session()
+        try:
+            if session.in_transaction():
+                if session.new or session.dirty or session.deleted:
+                    logger.warning("Discarding uncommitted changes left by a background task.")
+                    session.rollback()
+                else:
+                    session.commit()
+        except Exception as e:
+            logger.error(f"Error ending background session transaction: {e}")
+            session.rollback()
+        finally:
+            self.session.remove()
+
+    def reset(self):
+        """Close the current session, dropping its identity map."""
+        self.session.remove()
+
+    def close(self):
+        """Close every session of this scope and report leaked connections."""
+        if self._closed:
+            return
+        self.session.remove()
+        with self._lock:
+            self._closed = True
+            busy = bool(self._workers)
+            if busy:
+                # Stay registered so release_thread_sessions reaches the workers
+                _closing.add(self)
+        if busy:
+            logger.info(f"Session scope closing; waiting on {len(self._workers)} background session(s)")
+            return
+        self._finish_close()
+
+    def _finish_close(self):
+        _scopes.discard(self)
+        event.remove(self._factory, "after_begin", self._on_begin)
+        event.remove(self._factory, "after_flush", self._on_flush)
+        event.remove(self._factory, "do_orm_execute", self._on_execute)
+        event.remove(self._factory, "after_commit", self._on_commit)
+        event.remove(self._factory, "after_rollback", self._on_rollback)
+        leaked = connection_tracker().report_leaks(older_than=0)
+        logger.info(f"Session scope closed; connections still checked out: {leaked}")
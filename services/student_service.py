@@ -1,58 +1,235 @@
 """
 services/student_service.py - Student CRUD service with search and pagination
 """
+import base64
+import json
 import logging
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import or_, tuple_, func, text
 from models.student import Student
+from services.session_manager import read_only
+from services.analytics_cache import analytics_cache
+from services.summary_service import SummaryService
 
 logger = logging.getLogger(__name__)
 
+# Below this many estimated rows an exact COUNT(*) is cheap enough to run
+EXACT_COUNT_THRESHOLD = 1000
+
+# Trigram matching needs at least this many characters to be selective
+TRIGRAM_MIN_LENGTH = 3
+
 
 class StudentService:
+    # Whether pg_trgm is installed; checked once per process
+    _trigram_available = None
+
     def __init__(self, db: Session):
         self.db = db
 
+    def has_trigram(self) -> bool:
+        """Return True when the pg_trgm extension is available."""
+        if StudentService._trigram_available is None:
+            try:
+                found = self.db.execute(
+                    text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                ).first()
+                StudentService._trigram_available = found is not None
+            except Exception as e:
+                logger.warning(f"Could not check for pg_trgm, using prefix search: {e}")
+                self.db.rollback()
+                StudentService._trigram_available = False
+        return StudentService._trigram_available
+
+    @staticmethod
+    def _full_name():
+        return Student.first_name + " " + Student.last_name
+
+    @read_only
     def get_all(self):
-        # Ensure session is fresh before query
-        try:
-            self.db.rollback()
-        except:
-            pass
-        return self.db.query(Student).order_by(Student.first_name).all()
+        return self.db.query(Student).populate_existing().order_by(Student.first_name).all()
+
+    def result_counts(self, student_ids):
+        """Return {student_id: number of results} from the student summaries."""
+        return SummaryService(self.db).result_counts(student_ids)
 
     def get_by_id(self, student_id: int):
-        return self.db.query(Student).filter(Student.id == student_id).first()
+        return self.db.query(Student).populate_existing().filter(Student.id == student_id).first()
 
     def get_by_admission(self, admission_number: str):
-        return self.db.query(Student).filter(Student.admission_number == admission_number).first()
+        return (self.db.query(Student).populate_existing()
+                .filter(Student.admission_number == admission_number).first())
 
     def get_by_class(self, class_id: int):
-        return self.db.query(Student).filter(Student.class_id == class_id).all()
+        return self.db.query(Student).populate_existing().filter(Student.class_id == class_id).all()
 
-    def search(self, query: str, class_id: int = None, page: int = 1, page_size: int = 20):
-        """Search students with optional class filter and pagination."""
-        # Ensure session is fresh before query
-        try:
-            self.db.rollback()
-        except:
-            pass
-        q = self.db.query(Student)
+    def _match(self, query: str):
+        """Return the filter clause matching students against a search string.
+
+        Matching is by substring. With pg_trgm it is served by the GIN
+        trigram indexes and the similarity operator (%) also catches misspelt
+        names; without it the substring match scans, and callers that only
+        need the first few rows try ``_prefix_match`` (lower() btree indexes)
+        first.
+        """
+        pattern = f"%{query}%"
+        clauses = [
+            Student.first_name.ilike(pattern),
+            Student.last_name.ilike(pattern),
+            Student.admission_number.ilike(pattern),
+        ]
+        if len(query) >= TRIGRAM_MIN_LENGTH and self.has_trigram():
+            clauses += [
+                Student.first_name.op("%")(query),
+                Student.last_name.op("%")(query),
+                self._full_name().op("%")(query),
+            ]
+        return or_(*clauses)
+
+    @staticmethod
+    def _prefix_match(query: str):
+        """Prefix-only subset of ``_match``, served by the lower() prefix indexes."""
+        prefix = f"{query.lower()}%"
+        return or_(
+            func.lower(Student.first_name).like(prefix),
+            func.lower(Student.last_name).like(prefix),
+            func.lower(Student.admission_number).like(prefix),
+        )
+
+    def _filtered(self, query: str, class_id: int = None):
+        # Objects outlive commits (expire_on_commit=False): refresh loaded rows
+        q = self.db.query(Student).populate_existing()
         if query:
-            pattern = f"%{query}%"
-            q = q.filter(
-                or_(
-                    Student.first_name.ilike(pattern),
-                    Student.last_name.ilike(pattern),
-                    Student.admission_number.ilike(pattern),
-                )
-            )
+            q = q.filter(self._match(query))
         if class_id:
             q = q.filter(Student.class_id == class_id)
+        return q
+
+    @read_only
+    def search(self, query: str, class_id: int = None, page: int = 1, page_size: int = 20):
+        """Search students with optional class filter and pagination."""
+        q = self._filtered(query, class_id)
         total = q.count()
         students = q.order_by(Student.first_name).offset((page - 1) * page_size).limit(page_size).all()
         return students, total
 
+    @read_only
+    def fuzzy_search(self, query: str, class_id: int = None, limit: int = 50):
+        """Return up to ``limit`` students ranked by how well they match ``query``.
+
+        Uses trigram similarity when pg_trgm is installed, so typos still find
+        the student; otherwise prefix matches (an index lookup) come first,
+        topped up with substring matches only when they do not fill ``limit``.
+        """
+        query = (query or "").strip()
+        if query and not self.has_trigram():
+            return self._prefix_then_substring(query, class_id, limit)
+        q = self._filtered(query, class_id).options(joinedload(Student.class_))
+        if query and len(query) >= TRIGRAM_MIN_LENGTH:
+            rank = func.greatest(
+                func.similarity(Student.first_name, query),
+                func.similarity(Student.last_name, query),
+                func.similarity(self._full_name(), query),
+                func.similarity(Student.admission_number, query),
+            )
+            q = q.order_by(rank.desc(), Student.first_name, Student.id)
+        else:
+            q = q.order_by(Student.first_name, Student.id)
+        return q.limit(limit).all()
+
+    def _prefix_then_substring(self, query: str, class_id: int, limit: int):
+        q = self.db.query(Student).options(joinedload(Student.class_)).populate_existing()
+        if class_id:
+            q = q.filter(Student.class_id == class_id)
+        order = (Student.first_name, Student.id)
+        students = q.filter(self._prefix_match(query)).order_by(*order).limit(limit).all()
+        if len(students) < limit:
+            found = [s.id for s in students]
+            rest = q.filter(self._match(query))
+            if found:
+                rest = rest.filter(Student.id.notin_(found))
+            students += rest.order_by(*order).limit(limit - len(students)).all()
+        return students
+
+    @staticmethod
+    def encode_cursor(student: Student) -> str:
+        """Return an opaque cursor token positioned at the given student."""
+        raw = json.dumps([student.first_name, student.id]).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor: str):
+        """Return the (first_name, id) key stored in a cursor token."""
+        try:
+            first_name, student_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            return str(first_name), int(student_id)
+        except Exception:
+            raise ValueError("Invalid page cursor.")
+
+    def estimate_count(self, q) -> int:
+        """Return the planner's row estimate for a query, exact when small."""
+        compiled = q.statement.compile(dialect=self.db.bind.dialect)
+        plan = self.db.connection().exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate < EXACT_COUNT_THRESHOLD:
+            return q.count()
+        return estimate
+
+    @read_only
+    def search_keyset(self, query: str, class_id: int = None, cursor: str = None,
+                      direction: str = "next", page_size: int = 20, total: str = None):
+        """Search students using keyset (seek) pagination ordered by (first_name, id).
+
+        Pages are addressed by opaque cursor tokens instead of offsets, so every
+        page costs the same as the first. ``direction`` is "next" to read the
+        rows after ``cursor`` or "prev" to read the rows before it.
+        ``total`` is None to skip counting, "exact" for COUNT(*) or "estimate"
+        for the planner's estimate.
+
+        Returns (students, total, prev_cursor, next_cursor); a cursor is None
+        when there is no page in that direction.
+        """
+        if direction not in ("next", "prev"):
+            raise ValueError("Direction must be 'next' or 'prev'.")
+        q = self._filtered(query, class_id)
+
+        count = None
+        if total == "exact":
+            count = q.count()
+        elif total == "estimate":
+            count = self.estimate_count(q)
+
+        key = tuple_(Student.first_name, Student.id)
+        page_q = q
+        if cursor:
+            position = self.decode_cursor(cursor)
+            page_q = page_q.filter(key > position if direction == "next" else key < position)
+        if direction == "next":
+            page_q = page_q.order_by(Student.first_name, Student.id)
+        else:
+            page_q = page_q.order_by(Student.first_name.desc(), Student.id.desc())
+
+        # Fetch one extra row to learn whether another page follows
+        students = page_q.options(joinedload(Student.class_)).limit(page_size + 1).all()
+        has_more = len(students) > page_size
+        students = students[:page_size]
+        if direction == "prev":
+            students.reverse()
+
+        if not students:
+            return students, count, None, None
+        if direction == "next":
+            has_prev, has_next = bool(cursor), has_more
+        else:
+            has_prev, has_next = has_more, True
+        prev_cursor = self.encode_cursor(students[0]) if has_prev else None
+        next_cursor = self.encode_cursor(students[-1]) if has_next else None
+        return students, count, prev_cursor, next_cursor
+
     def create(self, admission_number: str, first_name: str, last_name: str,
                gender: str, date_of_birth=None, class_id: int = None, password_hash: str = None) -> Student:
         if self.get_by_admission(admission_number):
@@ -69,6 +246,7 @@ class StudentService:
         try:
             self.db.add(student)
             self.db.commit()
+            analytics_cache.invalidate()
             self.db.refresh(student)
             logger.info(f"Student created: {student.full_name} ({student.admission_number})")
             return student
@@ -93,6 +271,7 @@ class StudentService:
         student.class_id = class_id
         try:
             self.db.commit()
+            analytics_cache.invalidate()
             self.db.refresh(student)
             return student
         except Exception as e:
@@ -107,6 +286,7 @@ class StudentService:
         try:
             self.db.delete(student)
             self.db.commit()
+            analytics_cache.invalidate()
             logger.info(f"Student deleted id={student_id}")
         except Exception as e:
             self.db.rollback()
@@ -2,8 +2,12 @@
 services/subject_service.py - Subject CRUD service
 """
 import logging
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from models.subject import Subject
+from models.result import Result
+from services.session_manager import read_only
+from services.analytics_cache import analytics_cache
+from services.summary_service import SummaryService
 
 logger = logging.getLogger(__name__)
 
@@ -12,22 +16,24 @@ class SubjectService:
     def __init__(self, db: Session):
         self.db = db
 
+    def _query(self):
+        # Objects outlive commits (expire_on_commit=False): refresh loaded rows
+        return (self.db.query(Subject)
+                .options(joinedload(Subject.class_), joinedload(Subject.teacher))
+                .populate_existing())
+
+    @read_only
     def get_all(self):
-        # Ensure session is fresh before query
-        try:
-            self.db.rollback()
-        except:
-            pass
-        return self.db.query(Subject).order_by(Subject.subject_name).all()
+        return self._query().order_by(Subject.subject_name).all()
 
     def get_by_id(self, subject_id: int):
-        return self.db.query(Subject).filter(Subject.id == subject_id).first()
+        return self._query().filter(Subject.id == subject_id).first()
 
     def get_by_class(self, class_id: int):
-        return self.db.query(Subject).filter(Subject.class_id == class_id).all()
+        return self._query().filter(Subject.class_id == class_id).all()
 
     def get_by_teacher(self, teacher_id: int):
-        return self.db.query(Subject).filter(Subject.teacher_id == teacher_id).all()
+        return self._query().filter(Subject.teacher_id == teacher_id).all()
 
     def create(self, subject_name: str, class_id: int = None, teacher_id: int = None) -> Subject:
         subject = Subject(
@@ -38,6 +44,7 @@ class SubjectService:
         try:
             self.db.add(subject)
             self.db.commit()
+            analytics_cache.invalidate()
             self.db.refresh(subject)
             logger.info(f"Subject created: {subject.subject_name}")
             return subject
@@ -55,6 +62,7 @@ class SubjectService:
         subject.teacher_id = teacher_id
         try:
             self.db.commit()
+            analytics_cache.invalidate()
             self.db.refresh(subject)
             return subject
         except Exception as e:
@@ -67,8 +75,14 @@ class SubjectService:
         if not subject:
             raise ValueError("Subject not found.")
         try:
+            # Results cascade with the subject; their students' summaries must follow
+            affected = [sid for (sid,) in self.db.query(Result.student_id)
+                        .filter(Result.subject_id == subject_id).all()]
             self.db.delete(subject)
+            self.db.flush()
+            SummaryService(self.db).refresh(affected)
             self.db.commit()
+            analytics_cache.invalidate()
             logger.info(f"Subject deleted id={subject_id}")
         except Exception as e:
             self.db.rollback()
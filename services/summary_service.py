@@ -0,0 +1,131 @@
+"""
+services/summary_service.py - Incremental maintenance of the student_summary table
+"""
+import logging
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, text, bindparam, Integer
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from config import PASS_MARK
+from models.result import Result
+from models.student import Student
+from models.student_summary import StudentSummary
+from services.session_manager import read_only
+from services.analytics_cache import analytics_cache
+
+logger = logging.getLogger(__name__)
+
+# Students per INSERT ... SELECT when refreshing a large set
+REFRESH_BATCH_SIZE = 5000
+
+# First key of the (class, student_id) advisory locks taken while refreshing
+SUMMARY_LOCK_CLASS = 7251
+
+
+class SummaryService:
+    """
+    Keeps one student_summary row per student in step with results.
+
+    ResultService (and SubjectService for cascaded deletes) call ``refresh``
+    with the students whose marks changed, inside the same transaction, so a
+    summary only ever re-aggregates that student's own results. ``rebuild``
+    recomputes every row and is used for repairs.
+
+    Refreshes are serialised per student (``_lock``) before aggregating:
+    under READ COMMITTED two transactions saving marks for the same student
+    would otherwise each aggregate a snapshot without the other's new mark,
+    and the later upsert would overwrite the summary with a stale total.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _upsert_from_results(self, student_ids=None):
+        aggregate = (
+            select(
+                Student.id,
+                func.coalesce(func.sum(Result.marks), 0),
+                func.count(Result.id),
+                func.coalesce(func.avg(Result.marks), 0),
+                func.coalesce(func.avg(Result.gpa), 0),
+                func.count(Result.id).filter(Result.marks >= PASS_MARK),
+                func.now(),
+            )
+            .select_from(Student)
+            .outerjoin(Result, Result.student_id == Student.id)
+            .group_by(Student.id)
+        )
+        if student_ids is not None:
+            aggregate = aggregate.where(Student.id.in_(student_ids))
+        columns = ["student_id", "total_marks", "result_count", "avg_marks",
+                   "avg_gpa", "pass_count", "updated_at"]
+        stmt = pg_insert(StudentSummary.__table__).from_select(columns, aggregate)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["student_id"],
+            set_={c: getattr(stmt.excluded, c) for c in columns[1:]},
+        )
+        return self.db.execute(stmt).rowcount
+
+    def _lock(self, student_ids=None):
+        """Hold summary locks for ``student_ids`` (or all students) until commit.
+
+        Taken in statements of their own, so the aggregate that follows gets
+        a snapshot that includes every competing transaction committed while
+        waiting. Per-student advisory locks are acquired in id order to avoid
+        deadlocks; a full refresh locks the table against all of them.
+        """
+        if student_ids is None:
+            self.db.execute(text("LOCK TABLE student_summary IN SHARE ROW EXCLUSIVE MODE"))
+            return
+        self.db.execute(text("LOCK TABLE student_summary IN ROW EXCLUSIVE MODE"))
+        self.db.execute(
+            text("SELECT pg_advisory_xact_lock(:cls, k) "
+                 "FROM (SELECT unnest(:ids) AS k ORDER BY 1) ids")
+            .bindparams(bindparam("ids", type_=ARRAY(Integer))),
+            {"cls": SUMMARY_LOCK_CLASS, "ids": student_ids},
+        )
+
+    def refresh(self, student_ids=None):
+        """Re-aggregate the summaries of the given students, or of everyone (no commit)."""
+        if student_ids is None:
+            self._lock()
+            self._upsert_from_results()
+            return
+        ids = sorted(set(student_ids))
+        if not ids:
+            return
+        self._lock(ids)
+        for start in range(0, len(ids), REFRESH_BATCH_SIZE):
+            self._upsert_from_results(ids[start:start + REFRESH_BATCH_SIZE])
+
+    def rebuild(self) -> int:
+        """Recompute every student's summary from results and commit."""
+        try:
+            self._lock()
+            count = self._upsert_from_results()
+            self.db.commit()
+            analytics_cache.invalidate()
+            logger.info(f"Student summaries rebuilt: {count} row(s)")
+            return count
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error rebuilding student summaries: {e}")
+            raise
+
+    @read_only
+    def get(self, student_id: int):
+        """Return the StudentSummary for a student, or None."""
+        # The summary is rewritten by Core upserts; never trust a loaded copy
+        return self.db.get(StudentSummary, student_id, populate_existing=True)
+
+    @read_only
+    def result_counts(self, student_ids):
+        """Return {student_id: result_count} for the given students."""
+        ids = list(student_ids)
+        if not ids:
+            return {}
+        rows = (
+            self.db.query(StudentSummary.student_id, StudentSummary.result_count)
+            .filter(StudentSummary.student_id.in_(ids))
+            .all()
+        )
+        return {r.student_id: r.result_count for r in rows}
@@ -2,9 +2,10 @@
 services/teacher_service.py - Teacher CRUD service
 """
 import logging
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from models.user import Teacher
 from services.auth_service import AuthService
+from services.session_manager import read_only
 
 logger = logging.getLogger(__name__)
 
@@ -13,29 +14,20 @@ class TeacherService:
     def __init__(self, db: Session):
         self.db = db
 
+    def _query(self):
+        # Objects outlive commits (expire_on_commit=False): refresh loaded rows
+        # and the subject lists shown next to them
+        return self.db.query(Teacher).options(selectinload(Teacher.subjects)).populate_existing()
+
+    @read_only
     def get_all(self):
-        # Ensure session is fresh before query
-        try:
-            self.db.rollback()
-        except:
-            pass
-        return self.db.query(Teacher).order_by(Teacher.full_name).all()
+        return self._query().order_by(Teacher.full_name).all()
 
     def get_by_id(self, teacher_id: int):
-        return self.db.query(Teacher).filter(Teacher.id == teacher_id).first()
+        return self._query().filter(Teacher.id == teacher_id).first()
 
     def get_by_email(self, email: str):
-        # Ensure clean session state and use explicit columns
-        try:
-            self.db.rollback()
-        except:
-            pass
-        try:
-            return self.db.query(Teacher).filter(Teacher.email == email.strip().lower()).first()
-        except Exception as e:
-            # If error, try to expire session and retry
-            self.db.expire_all()
-            return self.db.query(Teacher).filter(Teacher.email == email.strip().lower()).first()
+        return self.db.query(Teacher).filter(Teacher.email == email.strip().lower()).first()
 
     def create(self, full_name: str, email: str, password: str) -> Teacher:
         email = email.strip().lower()
@@ -0,0 +1,61 @@
+"""
+tests/test_startup.py - Startup must not pull in the heavy libraries
+
+Imports what main.py needs before the login window in a fresh interpreter.
+No display or database is needed: the engine is created but never connects.
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+for dependency in ("sqlalchemy", "dotenv", "psycopg2", "bcrypt"):
+    pytest.importorskip(dependency)
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.startup_profile import HEAVY_MODULES  # noqa: E402
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import services, views.admin_dashboard
+elapsed_ms = (time.perf_counter() - started) * 1000
+from config import STARTUP_BUDGET_MS
+from utils.startup_profile import HEAVY_MODULES
+print(json.dumps({
+    "heavy": [name for name in HEAVY_MODULES if name in sys.modules],
+    "elapsed_ms": elapsed_ms,
+    "budget_ms": STARTUP_BUDGET_MS,
+}))
+"""
+
+
+@pytest.fixture(scope="module")
+def startup(tmp_path_factory):
+    # config.py needs the connection settings (DB_PASSWORD goes through
+    # quote_plus) and logs to school_results.log in the working directory
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(ROOT),
+        "DB_USER": "test", "DB_PASSWORD": "test", "DB_HOST": "localhost",
+        "DB_PORT": "5432", "DB_NAME": "test",
+    }
+    proc = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, cwd=tmp_path_factory.mktemp("startup"),
+        capture_output=True, text=True, timeout=120,
+    )
+    assert proc.returncode == 0, proc.stderr
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_no_heavy_modules_before_login(startup):
+    assert startup["heavy"] == [], f"imported at startup: {startup['heavy']} (of {HEAVY_MODULES})"
+
+
+def test_imports_within_startup_budget(startup):
+    assert startup["elapsed_ms"] < startup["budget_ms"]
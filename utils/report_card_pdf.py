@@ -0,0 +1,137 @@
+"""
+utils/report_card_pdf.py - Student report card rendering (ReportLab only)
+
+Kept free of database and Tk imports so batch workers can import it cheaply.
+"""
+import io
+import re
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.platypus import (
+    SimpleDocTemplate, Table, TableStyle, Paragraph,
+    Spacer, HRFlowable
+)
+
+
+def card_filename(admission_number: str, student_id: int) -> str:
+    """File name for a student's report card, safe for any admission number.
+
+    The student id keeps names unique when sanitising maps two admission
+    numbers (e.g. "A/1" and "A-1" -> "A_1") to the same text.
+    """
+    return f"report_card_{re.sub(r'[^A-Za-z0-9_-]+', '_', admission_number)}_{student_id}.pdf"
+
+
+def render_report_card(card: dict, target):
+    """Render one report card to ``target`` (a path or a binary file object).
+
+    ``card`` holds plain values: student_id, student_name, admission_number,
+    class_name, gender, date_of_birth, date_generated and ``results``, a list
+    of (subject_name, marks, grade, gpa, remarks).
+    """
+    results = card["results"]
+    doc = SimpleDocTemplate(
+        target, pagesize=A4,
+        topMargin=1.5*cm, bottomMargin=1.5*cm,
+        leftMargin=2*cm, rightMargin=2*cm,
+    )
+    styles = getSampleStyleSheet()
+    story = []
+
+    # Header
+    title_style = ParagraphStyle(
+        "Title", parent=styles["Title"],
+        fontSize=18, textColor=colors.HexColor("#1a237e"),
+        spaceAfter=6,
+    )
+    sub_style = ParagraphStyle(
+        "Sub", parent=styles["Normal"],
+        fontSize=11, textColor=colors.HexColor("#555555"),
+        spaceAfter=4, alignment=1,
+    )
+    story.append(Paragraph("SCHOOL EXAMINATION RESULTS", title_style))
+    story.append(Paragraph("Student Report Card", sub_style))
+    story.append(HRFlowable(width="100%", thickness=2, color=colors.HexColor("#1a237e")))
+    story.append(Spacer(1, 0.4*cm))
+
+    # Student info
+    info_data = [
+        ["Student Name:", card["student_name"], "Admission No:", card["admission_number"]],
+        ["Class:", card["class_name"] or "N/A", "Gender:", card["gender"]],
+        ["Date of Birth:", str(card["date_of_birth"] or "N/A"), "Date Generated:", card["date_generated"]],
+    ]
+    info_table = Table(info_data, colWidths=[3.5*cm, 5*cm, 3.5*cm, 5*cm])
+    info_table.setStyle(TableStyle([
+        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+        ("FONTNAME", (2, 0), (2, -1), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 10),
+        ("TOPPADDING", (0, 0), (-1, -1), 3),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
+    ]))
+    story.append(info_table)
+    story.append(Spacer(1, 0.5*cm))
+
+    # Results table
+    table_data = [["#", "Subject", "Marks", "Grade", "GPA", "Remarks"]]
+    total_marks = 0
+    total_gpa = 0
+    for i, (subject_name, marks, grade, gpa, remarks) in enumerate(results, 1):
+        table_data.append([
+            str(i), subject_name,
+            f"{marks:.1f}", grade,
+            f"{gpa:.1f}", remarks,
+        ])
+        total_marks += marks
+        total_gpa += gpa
+
+    if results:
+        avg_marks = total_marks / len(results)
+        avg_gpa = total_gpa / len(results)
+        table_data.append(["", "AVERAGE", f"{avg_marks:.1f}", "", f"{avg_gpa:.2f}", ""])
+
+    t = Table(table_data, colWidths=[1*cm, 5*cm, 2.5*cm, 2*cm, 2*cm, 4*cm])
+    t.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1a237e")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 9),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("ALIGN", (1, 0), (1, -1), "LEFT"),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -2), [colors.HexColor("#f5f5f5"), colors.white]),
+        ("BACKGROUND", (0, -1), (-1, -1), colors.HexColor("#e8eaf6")),
+        ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#cccccc")),
+        ("TOPPADDING", (0, 0), (-1, -1), 4),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+    ]))
+    story.append(t)
+    story.append(Spacer(1, 1*cm))
+    story.append(Paragraph(
+        "This report card was generated automatically by the School Examination Results Management System.",
+        ParagraphStyle("footer", parent=styles["Normal"], fontSize=8,
+                       textColor=colors.grey, alignment=1)
+    ))
+
+    doc.build(story)
+    return target
+
+
+def render_card_batch(cards):
+    """Worker entry point: render a chunk of cards to PDF bytes.
+
+    Returns a list of (admission_number, filename, pdf_bytes, error) where
+    exactly one of pdf_bytes / error is set, so one bad card never sinks the
+    rest of its chunk.
+    """
+    out = []
+    for card in cards:
+        try:
+            buf = io.BytesIO()
+            render_report_card(card, buf)
+            out.append((card["admission_number"], card_filename(card["admission_number"], card["student_id"]),
+                        buf.getvalue(), None))
+        except Exception as e:
+            out.append((card["admission_number"], None, None, str(e)))
+    return out
@@ -0,0 +1,121 @@
+"""
+utils/startup_profile.py - Import timing and time-to-login for `main.py --profile-startup`
+
+Deliberately imports nothing from the application so it can be installed
+before any other module is loaded.
+"""
+import importlib.machinery
+import sys
+import time
+
+# Libraries that must not be loaded before the login window is shown
+HEAVY_MODULES = ("matplotlib", "reportlab", "pyarrow", "pandas", "numpy")
+
+# Modules listed in the breakdown
+TOP_MODULES = 25
+
+_TIMED_LOADERS = (
+    importlib.machinery.SourceFileLoader,
+    importlib.machinery.SourcelessFileLoader,
+    importlib.machinery.ExtensionFileLoader,
+)
+
+
+class StartupProfiler:
+    """
+    Times every module executed after ``start()``.
+
+    A finder placed first on ``sys.meta_path`` lets the normal finders locate
+    the module and wraps the found loader's ``exec_module``, recording the
+    inclusive time (with the imports it triggers) and the self time of each
+    module. ``mark(label)`` records the time since ``started`` (process start
+    as seen by main.py) for milestones such as the login window appearing.
+    """
+
+    def __init__(self):
+        self.started = None
+        self.inclusive = {}
+        self.own = {}
+        self.marks = []
+        self._stack = []
+
+    def start(self, started: float = None):
+        self.started = started if started is not None else time.perf_counter()
+        sys.meta_path.insert(0, self)
+
+    def stop(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        loader = spec.loader
+        if isinstance(loader, _TIMED_LOADERS):
+            exec_module = loader.exec_module
+            loader.exec_module = lambda module: self._exec(fullname, exec_module, module)
+        return spec
+
+    def _exec(self, name, exec_module, module):
+        self._stack.append(0.0)
+        began = time.perf_counter()
+        try:
+            exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - began
+            children = self._stack.pop()
+            self.inclusive[name] = elapsed
+            self.own[name] = elapsed - children
+            if self._stack:
+                self._stack[-1] += elapsed
+
+    def mark(self, label: str) -> float:
+        """Record and return the seconds elapsed since start for ``label``."""
+        elapsed = time.perf_counter() - self.started
+        self.marks.append((label, elapsed))
+        return elapsed
+
+    def heavy_modules_loaded(self):
+        return [name for name in HEAVY_MODULES if name in sys.modules]
+
+    def report(self, budget_ms: int = None) -> bool:
+        """Print the breakdown; returns False when startup broke the budget."""
+        print(f"\nSlowest imports (inclusive ms / self ms), {len(self.inclusive)} modules timed:")
+        slowest = sorted(self.inclusive.items(), key=lambda kv: kv[1], reverse=True)[:TOP_MODULES]
+        for name, seconds in slowest:
+            print(f"  {seconds * 1000:9.1f} {self.own[name] * 1000:9.1f}  {name}")
+
+        packages = {}
+        for name, seconds in self.own.items():
+            top = name.split(".", 1)[0]
+            packages[top] = packages.get(top, 0.0) + seconds
+        print("\nImport time by top-level package (ms):")
+        for top, seconds in sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:TOP_MODULES]:
+            print(f"  {seconds * 1000:9.1f}  {top}")
+
+        print("\nMilestones (ms since start):")
+        for label, seconds in self.marks:
+            print(f"  {seconds * 1000:9.1f}  {label}")
+
+        ok = True
+        heavy = self.heavy_modules_loaded()
+        if heavy:
+            print(f"\nFAIL: heavy modules loaded during startup: {', '.join(heavy)}")
+            ok = False
+        if budget_ms is not None and self.marks:
+            label, seconds = self.marks[-1]
+            if seconds * 1000 > budget_ms:
+                print(f"\nFAIL: {label} took {seconds * 1000:.0f} ms (budget {budget_ms} ms)")
+                ok = False
+            else:
+                print(f"\nOK: {label} in {seconds * 1000:.0f} ms (budget {budget_ms} ms)")
+        return ok
+
+
+startup_profiler = StartupProfiler()
@@ -0,0 +1,182 @@
+"""
+utils/task_runner.py - Background task execution for Tk views
+"""
+import logging
+import queue
+import threading
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from config import TASK_WORKERS
+from utils.ui_helpers import show_error
+
+logger = logging.getLogger(__name__)
+
+# How often (ms) the Tk thread collects finished tasks
+POLL_INTERVAL_MS = 30
+
+
+class Task:
+    """Handle for a submitted task.
+
+    ``cancel`` skips the work if it has not started and drops its result
+    otherwise; long-running work may poll ``is_cancelled`` to stop early.
+    """
+
+    def __init__(self, key=None, owner=None, on_done=None, on_error=None):
+        self.key = key
+        self.owner = owner
+        self.on_done = on_done
+        self.on_error = on_error
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self.cancelled.is_set()
+
+
+class TaskRunner:
+    """
+    Runs blocking work (database queries, report rendering, bcrypt) on a
+    shared thread pool and hands results back to the Tk thread.
+
+    Workers never touch widgets: finished tasks are queued and collected by
+    an ``after()`` poll on the root window, which then calls ``on_done`` or
+    ``on_error`` on the Tk thread. Submitting a task with the same ``key`` as
+    a pending one supersedes it, and results for an ``owner`` widget that has
+    since been destroyed are discarded. The root cursor shows "watch" while
+    any task is pending. ``thread_cleanup`` runs on the worker after every
+    task (e.g. to release its thread-local database session).
+    """
+
+    def __init__(self, root, workers: int = TASK_WORKERS, thread_cleanup=None):
+        self.root = root
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ui-task")
+        self._finished = queue.SimpleQueue()
+        self._latest = {}
+        self._live = set()
+        self._pending = 0
+        self._futures = set()
+        self._thread_cleanup = thread_cleanup
+        self._closed = False
+        self.root.after(POLL_INTERVAL_MS, self._poll)
+
+    def submit(self, fn, *args, on_done=None, on_error=None, key=None, owner=None, **kwargs) -> Task:
+        """Run ``fn(*args, **kwargs)`` in the background.
+
+        ``on_done(result)`` / ``on_error(exc)`` run on the Tk thread; errors go
+        to ``show_error`` when no ``on_error`` is given.
+        """
+        task = Task(key, owner, on_done, on_error)
+        if key is not None:
+            previous = self._latest.get(key)
+            if previous is not None:
+                previous.cancel()
+            self._latest[key] = task
+        self._live.add(task)
+        self._pending += 1
+        self._set_busy(True)
+        future = self._pool.submit(self._run, task, fn, args, kwargs)
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+        return task
+
+    def _run(self, task, fn, args, kwargs):
+        outcome = None
+        try:
+            if not task.is_cancelled:
+                outcome = (True, fn(*args, **kwargs))
+        except Exception as e:
+            logger.exception(f"Background task {getattr(fn, '__name__', fn)} failed")
+            outcome = (False, e)
+        finally:
+            if self._thread_cleanup:
+                try:
+                    self._thread_cleanup()
+                except Exception as e:
+                    logger.error(f"Error cleaning up after background task: {e}")
+            self._finished.put((task, outcome))
+
+    def _poll(self):
+        if self._closed:
+            return
+        try:
+            while True:
+                task, outcome = self._finished.get_nowait()
+                self._task_finished(task)
+                self._deliver(task, outcome)
+        except queue.Empty:
+            pass
+        if not self._closed:
+            try:
+                self.root.after(POLL_INTERVAL_MS, self._poll)
+            except tk.TclError:
+                # The root window was destroyed under us
+                self._closed = True
+
+    def _task_finished(self, task):
+        if task.key is not None and self._latest.get(task.key) is task:
+            self._latest.pop(task.key, None)
+        self._live.discard(task)
+        self._pending = max(self._pending - 1, 0)
+        if not self._pending:
+            self._set_busy(False)
+
+    def _deliver(self, task, outcome):
+        if outcome is None or task.is_cancelled:
+            return
+        if task.owner is not None and not task.owner.winfo_exists():
+            return
+        ok, value = outcome
+        try:
+            if ok:
+                if task.on_done:
+                    task.on_done(value)
+            elif task.on_error:
+                task.on_error(value)
+            else:
+                show_error("Error", str(value))
+        except Exception as e:
+            logger.exception(f"Error handling background task result: {e}")
+
+    def _set_busy(self, busy: bool):
+        try:
+            self.root.configure(cursor="watch" if busy else "")
+        except Exception:
+            pass
+
+    def cancel_all(self):
+        """Cancel every pending task, keyed or not (e.g. on logout)."""
+        for task in list(self._live):
+            task.cancel()
+        self._latest.clear()
+
+    def shutdown(self, wait: bool = False, cancel_futures: bool = True) -> bool:
+        """Stop polling, cancel every task and stop the pool.
+
+        Returns True when a task was already running and is still busy; the
+        interpreter would wait for it at exit.
+        """
+        self._closed = True
+        self.cancel_all()
+        self._pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+        return any(not future.done() for future in list(self._futures))
+
+
+_runner = None
+
+
+def init_task_runner(root, thread_cleanup=None) -> TaskRunner:
+    """Create the application-wide runner bound to the Tk root window."""
+    global _runner
+    _runner = TaskRunner(root, thread_cleanup=thread_cleanup)
+    return _runner
+
+
+def task_runner() -> TaskRunner:
+    """Return the application-wide runner."""
+    if _runner is None:
+        raise RuntimeError("init_task_runner() has not been called.")
+    return _runner
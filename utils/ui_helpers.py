@@ -2,8 +2,9 @@
 utils/ui_helpers.py - Reusable UI components and helper functions
 """
 import tkinter as tk
+from collections import OrderedDict
 from tkinter import ttk, messagebox
-from config import COLORS, FONTS
+from config import COLORS, FONTS, SEARCH_DEBOUNCE_MS
 
 
 def apply_treeview_style(style: ttk.Style):
@@ -197,6 +198,380 @@ def scrollable_treeview(parent, columns, headings, show_scrollbar=True, height=1
     return frame, tree
 
 
+class Debouncer:
+    """
+    Delays ``callback`` until calls have stopped for ``delay_ms``.
+
+    Each call re-arms the timer with the latest arguments, so a burst of
+    keystrokes produces a single callback. ``flush()`` fires a pending call
+    now (e.g. on <Return>) and ``cancel()`` drops it. Nothing fires once
+    ``widget`` has been destroyed.
+    """
+
+    def __init__(self, widget, callback, delay_ms: int = SEARCH_DEBOUNCE_MS):
+        self.widget = widget
+        self.callback = callback
+        self.delay_ms = delay_ms
+        self._after_id = None
+        self._args = ()
+
+    def __call__(self, *args):
+        self.cancel()
+        self._args = args
+        self._after_id = self.widget.after(self.delay_ms, self._fire)
+
+    def _fire(self):
+        self._after_id = None
+        if self.widget.winfo_exists():
+            self.callback(*self._args)
+
+    def flush(self):
+        if self._after_id is not None:
+            self.cancel()
+            self._fire()
+
+    def cancel(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    @property
+    def pending(self) -> bool:
+        return self._after_id is not None
+
+
+class KeyedTree:
+    """
+    Binds a Treeview to a keyed row list and refreshes it by diffing.
+
+    ``sync(rows)`` takes (key, values, tags) tuples in display order and
+    applies only the deletes, inserts, moves and value changes needed to
+    match them, so unchanged rows are left alone and the selection and
+    scroll position survive a refresh. All inserts and deletes of the tree's
+    items should go through the binding.
+
+    With ``stripe`` set, rows alternate the "odd"/"even" tags by position.
+    The stripe is not part of the row data: after an insert or delete, rows
+    below it only have their tags switched, never their values rewritten.
+    """
+
+    def __init__(self, tree, stripe: bool = False):
+        self.tree = tree
+        self.stripe = stripe
+        self._rows = {}
+        self._stripes = {}
+        self._order = []
+        if stripe:
+            tree.tag_configure("odd", background=COLORS["table_odd"])
+            tree.tag_configure("even", background=COLORS["table_even"])
+
+    def _shown_tags(self, key, tags):
+        return tags + (self._stripes[key],) if self.stripe else tags
+
+    def sync(self, rows, start: int = 0):
+        """Make the tree show ``rows``; returns (inserted, updated, deleted) counts.
+
+        ``start`` is the position of the first row in the whole list, so a
+        scrolled window keeps each row's stripe.
+        """
+        rows = [(str(key), tuple(values), tuple(tags)) for key, values, tags in rows]
+        keys = {key for key, _, _ in rows}
+        gone = [key for key in self._order if key not in keys]
+        if gone:
+            self.tree.delete(*gone)
+            for key in gone:
+                del self._rows[key]
+                self._stripes.pop(key, None)
+        order = [key for key in self._order if key in keys]
+        inserted = updated = 0
+        for index, (key, values, tags) in enumerate(rows):
+            stripe = ("odd" if (start + index) % 2 else "even") if self.stripe else None
+            if key in self._rows:
+                if order[index] != key:
+                    self.tree.move(key, "", index)
+                    order.remove(key)
+                    order.insert(index, key)
+                restripe = self._stripes.get(key) != stripe
+                self._stripes[key] = stripe
+                if self._rows[key] != (values, tags):
+                    self.tree.item(key, values=values, tags=self._shown_tags(key, tags))
+                    updated += 1
+                elif restripe:
+                    self.tree.item(key, tags=self._shown_tags(key, tags))
+            else:
+                self._stripes[key] = stripe
+                self.tree.insert("", index, iid=key, values=values, tags=self._shown_tags(key, tags))
+                order.insert(index, key)
+                inserted += 1
+            self._rows[key] = (values, tags)
+        self._order = order
+        return inserted, updated, len(gone)
+
+    def get(self, key):
+        """Return the (values, tags) shown for ``key``, or None."""
+        return self._rows.get(str(key))
+
+    def update(self, key, values, tags=()):
+        """Change one displayed row in place."""
+        key = str(key)
+        if key in self._rows:
+            self._rows[key] = (tuple(values), tuple(tags))
+            self.tree.item(key, values=values, tags=self._shown_tags(key, tuple(tags)))
+
+
+class VirtualTable(ttk.Frame):
+    """
+    Treeview that only materialises the rows currently in view.
+
+    Rows come from ``fetch(offset, limit)``, which returns a list of
+    (key, values, tags) tuples; it is called for blocks of ``block_size``
+    rows as they scroll into view and the most recent ``cached_blocks``
+    blocks are kept. With ``background`` set, ``fetch`` runs on the task
+    runner instead of the Tk thread: blocks not loaded yet show placeholder
+    rows (tag "loading") and are filled in when their fetch completes.
+    ``stripe`` alternates row backgrounds by absolute position. Selection
+    (single row) is tracked by key, so it survives its row scrolling out of
+    view, and ``<<TreeviewSelect>>`` is generated on the
+    table when the user changes it. Use ``tree`` for column widths and tag
+    colours.
+    """
+
+    # Key prefix of the placeholder rows shown while a block loads
+    PLACEHOLDER = "__loading__:"
+
+    def __init__(self, parent, columns, headings, height=18, block_size=200, cached_blocks=50,
+                 stripe: bool = False):
+        super().__init__(parent, style="Card.TFrame")
+        self.tree = ttk.Treeview(
+            self, columns=columns, show="headings",
+            style="Custom.Treeview", height=height, selectmode="browse",
+        )
+        for col, heading in zip(columns, headings):
+            self.tree.heading(col, text=heading)
+            self.tree.column(col, anchor="center", minwidth=60)
+        vsb = ttk.Scrollbar(self, orient="vertical", command=self._yview)
+        hsb = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=hsb.set)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        vsb.grid(row=0, column=1, sticky="ns")
+        hsb.grid(row=1, column=0, sticky="ew")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+        self._vsb = vsb
+
+        self.block_size = block_size
+        self.cached_blocks = cached_blocks
+        self._row_height = int(ttk.Style(self).lookup("Custom.Treeview", "rowheight") or 20)
+        self._visible = height
+        self._fetch = lambda offset, limit: []
+        self._background = False
+        self._loading = set()
+        self._generation = 0
+        self._failure_shown = False
+        self._total = 0
+        self._offset = 0
+        self._blocks = OrderedDict()
+        self._selected = None
+        self._selected_index = None
+        self._binding = KeyedTree(self.tree, stripe=stripe)
+        self.tree.tag_configure("loading", foreground=COLORS["text_secondary"])
+
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        self.tree.bind("<Configure>", self._on_resize)
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(seq, self._on_wheel)
+        for seq, step in (("<Up>", -1), ("<Down>", 1), ("<Prior>", "-page"), ("<Next>", "page"),
+                          ("<Home>", "home"), ("<End>", "end")):
+            self.tree.bind(seq, lambda e, s=step: self._on_key(s))
+
+    # ── Data source ──────────────────────────────────────────────────────────
+
+    def set_source(self, total: int, fetch, background: bool = False):
+        """Show ``total`` rows supplied by ``fetch``, from the top."""
+        self._fetch = fetch
+        self._background = background
+        self._selected = self._selected_index = None
+        self._offset = 0
+        self.invalidate(total)
+
+    def invalidate(self, total: int = None):
+        """Drop cached rows (optionally changing the row count) and redraw."""
+        if total is not None:
+            self._total = total
+        self._blocks.clear()
+        # Fetches still in flight belong to the old rows; their results are dropped
+        self._loading.clear()
+        self._generation += 1
+        self._failure_shown = False
+        self._render()
+
+    def _block(self, index):
+        """Return a cached block, fetching it; None while a background fetch runs."""
+        block = self._blocks.get(index)
+        if block is not None:
+            self._blocks.move_to_end(index)
+            return block
+        if self._background:
+            self._request(index)
+            return None
+        block = list(self._fetch(index * self.block_size, self.block_size))
+        self._store(index, block)
+        return block
+
+    def _store(self, index, block):
+        self._blocks[index] = block
+        while len(self._blocks) > self.cached_blocks:
+            self._blocks.popitem(last=False)
+
+    def _request(self, index):
+        if index in self._loading:
+            return
+        from utils.task_runner import task_runner
+        self._loading.add(index)
+        generation = self._generation
+        task_runner().submit(
+            self._fetch, index * self.block_size, self.block_size,
+            on_done=lambda block: self._block_loaded(generation, index, block),
+            on_error=lambda e: self._block_failed(generation, index, e),
+            key=(str(self), "block", index), owner=self,
+        )
+
+    def _block_loaded(self, generation, index, block):
+        if generation != self._generation:
+            return
+        self._loading.discard(index)
+        self._store(index, list(block))
+        self._render()
+
+    def _block_failed(self, generation, index, error):
+        if generation != self._generation:
+            return
+        # Left as placeholders; the next redraw of the block retries it. One
+        # dialog per generation, not one per block while the server is down
+        self._loading.discard(index)
+        if not self._failure_shown:
+            self._failure_shown = True
+            show_error("Error", str(error))
+
+    def _window(self, offset, count):
+        rows = []
+        last = min(offset + count, self._total)
+        for index in range(offset // self.block_size, (last - 1) // self.block_size + 1 if last else 0):
+            start = index * self.block_size
+            first, stop = max(offset, start), min(last, start + self.block_size)
+            block = self._block(index)
+            if block is None:
+                rows.extend(self._placeholder(i) for i in range(first, stop))
+            else:
+                rows.extend(block[first - start:stop - start])
+        return rows
+
+    def _placeholder(self, position):
+        columns = len(self.tree["columns"])
+        return (f"{self.PLACEHOLDER}{position}", ("…",) * columns, ("loading",))
+
+    # ── Rows and selection ───────────────────────────────────────────────────
+
+    def row(self, key):
+        """Return (values, tags) for a cached row, or None."""
+        for block in self._blocks.values():
+            for k, values, tags in block:
+                if k == key:
+                    return values, tags
+        return None
+
+    def update_row(self, key, values, tags=()):
+        """Replace a row's values in the cache and on screen."""
+        for block in self._blocks.values():
+            for i, row in enumerate(block):
+                if row[0] == key:
+                    block[i] = (key, values, tags)
+        self._binding.update(key, values, tags)
+
+    def selection(self):
+        """Return the selected key as a 1-tuple, or ()."""
+        return (self._selected,) if self._selected is not None else ()
+
+    def clear_selection(self):
+        self._selected = self._selected_index = None
+        self.tree.selection_set(())
+
+    def scroll_to(self, offset: int):
+        self._offset = max(0, min(offset, max(self._total - self._visible, 0)))
+        self._render()
+
+    def _render(self):
+        self._offset = max(0, min(self._offset, max(self._total - self._visible, 0)))
+        # Rows still in view after a scroll are moved, not recreated
+        self._binding.sync(self._window(self._offset, self._visible), start=self._offset)
+        if self._selected is not None and self.tree.exists(self._selected):
+            self.tree.selection_set(self._selected)
+        if self._total:
+            first = self._offset / self._total
+            self._vsb.set(first, min(1.0, (self._offset + self._visible) / self._total))
+        else:
+            self._vsb.set(0.0, 1.0)
+
+    def _on_tree_select(self, _event):
+        sel = self.tree.selection()
+        # Redraws drop and restore the selection; only user changes count
+        if not sel or sel[0] == self._selected or sel[0].startswith(self.PLACEHOLDER):
+            return
+        self._selected = sel[0]
+        self._selected_index = self._offset + self.tree.index(sel[0])
+        self.event_generate("<<TreeviewSelect>>")
+
+    # ── Scrolling ────────────────────────────────────────────────────────────
+
+    def _yview(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * self._total))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self._visible if args[2] == "pages" else 1)
+            self.scroll_to(self._offset + step)
+
+    def _on_wheel(self, event):
+        if event.num == 4:
+            step = -3
+        elif event.num == 5:
+            step = 3
+        else:
+            step = -3 if event.delta > 0 else 3
+        self.scroll_to(self._offset + step)
+        return "break"
+
+    def _on_key(self, step):
+        if not self._total:
+            return "break"
+        current = self._selected_index if self._selected_index is not None else self._offset - 1
+        if step == "home":
+            target = 0
+        elif step == "end":
+            target = self._total - 1
+        elif step in ("page", "-page"):
+            target = current + (self._visible if step == "page" else -self._visible)
+        else:
+            target = current + step
+        target = max(0, min(target, self._total - 1))
+        if target < self._offset:
+            self.scroll_to(target)
+        elif target >= self._offset + self._visible:
+            self.scroll_to(target - self._visible + 1)
+        children = self.tree.get_children()
+        index = target - self._offset
+        if 0 <= index < len(children):
+            self.tree.selection_set(children[index])
+            self.tree.focus(children[index])
+        return "break"
+
+    def _on_resize(self, event):
+        # The heading takes about one row; fill the rest of the height with rows
+        visible = max(1, event.height // self._row_height - 1)
+        if visible != self._visible:
+            self._visible = visible
+            self._render()
+
+
 def confirm_delete(item_name: str = "this item") -> bool:
     return messagebox.askyesno(
         "Confirm Delete",
@@ -9,19 +9,27 @@ from views.students_panel import StudentsPanel
 from views.teachers_panel import TeachersPanel
 from views.classes_subjects_panel import ClassesSubjectsPanel
 from views.results_panel import ResultsPanel
-from views.analytics_panel import AnalyticsPanel
-from views.reports_panel import ReportsPanel
+from utils.task_runner import task_runner
 from services import (
     StudentService, TeacherService, ClassService,
-    SubjectService, ResultService, ReportService, AnalyticsService
+    SubjectService, ResultService, ReportService, AnalyticsService,
+    ImportService, SessionManager,
 )
-from config import SessionLocal
 
 
 class AdminDashboard(BaseDashboard):
+    SECTION_TABLES = {
+        "Students": ("students", "classes", "student_summary"),
+        "Teachers": ("teachers", "subjects"),
+        "Classes & Subjects": ("classes", "subjects", "teachers", "students"),
+        "Results": ("results", "students", "subjects", "classes"),
+        "Reports": ("students", "classes", "subjects"),
+    }
+
     def __init__(self, master, user, logout_callback):
         self._user = user
         self._logout_callback = logout_callback
+        self.sessions = SessionManager(schedule=master.after_idle)
         self._init_services()
         self.NAV_ITEMS = [
             ("Dashboard",   self._show_overview),
@@ -37,19 +45,20 @@ class AdminDashboard(BaseDashboard):
         self._nav_click("Dashboard", self._show_overview)
 
     def _init_services(self):
-        # Create separate session for each service to prevent transaction issues
-        self.student_svc = StudentService(SessionLocal())
-        self.teacher_svc = TeacherService(SessionLocal())
-        self.class_svc = ClassService(SessionLocal())
-        self.subject_svc = SubjectService(SessionLocal())
-        self.result_svc = ResultService(SessionLocal())
-        self.report_svc = ReportService(SessionLocal())
-        self.analytics_svc = AnalyticsService(SessionLocal())
+        # All services share the dashboard's scoped session
+        db = self.sessions.session
+        self.student_svc = StudentService(db)
+        self.teacher_svc = TeacherService(db)
+        self.class_svc = ClassService(db)
+        self.subject_svc = SubjectService(db)
+        self.result_svc = ResultService(db)
+        self.report_svc = ReportService(db)
+        self.analytics_svc = AnalyticsService(db)
+        self.import_svc = ImportService(db)
 
     def _show_overview(self):
         self.update_section_title("Dashboard Overview")
         f = self.get_content_frame()
-        stats = self.analytics_svc.total_stats()
         header = tk.Frame(f, bg=COLORS["bg_medium"], pady=16)
         header.pack(fill="x", padx=20)
         tk.Label(header, text=f"Welcome, {self.user.full_name}",
@@ -61,19 +70,9 @@ class AdminDashboard(BaseDashboard):
 
         cards_row = tk.Frame(f, bg=COLORS["bg_medium"])
         cards_row.pack(fill="x", padx=20, pady=12)
-        stat_items = [
-            ("Total Students", stats["total_students"], COLORS["primary"]),
-            ("Total Results",  stats["total_results"],  COLORS["secondary"]),
-            ("Average Score",  f"{stats['avg_marks']}%", COLORS["success"]),
-        ]
-        for i, (label, val, color) in enumerate(stat_items):
-            card = tk.Frame(cards_row, bg=color, padx=28, pady=22)
-            card.grid(row=0, column=i, padx=10, sticky="ew")
-            cards_row.columnconfigure(i, weight=1)
-            tk.Label(card, text=str(val), font=("Segoe UI", 32, "bold"),
-                     bg=color, fg="white").pack()
-            tk.Label(card, text=label, font=FONTS["body"],
-                     bg=color, fg="#d0d8ff").pack()
+        task_runner().submit(self.analytics_svc.snapshot,
+                             on_done=lambda stats: self._build_overview_cards(cards_row, stats),
+                             key="overview", owner=cards_row)
 
         # Quick nav
         quick = tk.Frame(f, bg=COLORS["bg_medium"])
@@ -98,6 +97,21 @@ class AdminDashboard(BaseDashboard):
                       ).grid(row=0, column=i, padx=6, sticky="ew")
             btn_row.columnconfigure(i, weight=1)
 
+    def _build_overview_cards(self, cards_row, stats):
+        stat_items = [
+            ("Total Students", stats.total_students, COLORS["primary"]),
+            ("Total Results",  stats.total_results,  COLORS["secondary"]),
+            ("Average Score",  f"{stats.avg_marks}%", COLORS["success"]),
+        ]
+        for i, (label, val, color) in enumerate(stat_items):
+            card = tk.Frame(cards_row, bg=color, padx=28, pady=22)
+            card.grid(row=0, column=i, padx=10, sticky="ew")
+            cards_row.columnconfigure(i, weight=1)
+            tk.Label(card, text=str(val), font=("Segoe UI", 32, "bold"),
+                     bg=color, fg="white").pack()
+            tk.Label(card, text=label, font=FONTS["body"],
+                     bg=color, fg="#d0d8ff").pack()
+
     def _show_students(self):
         self.update_section_title("Student Management")
         StudentsPanel(self.get_content_frame(), self.student_svc, self.class_svc)
@@ -114,13 +128,17 @@ class AdminDashboard(BaseDashboard):
     def _show_results(self):
         self.update_section_title("Results Management")
         ResultsPanel(self.get_content_frame(), self.result_svc,
-                     self.student_svc, self.subject_svc, self.class_svc)
+                     self.student_svc, self.subject_svc, self.class_svc,
+                     import_svc=self.import_svc)
 
     def _show_analytics(self):
         self.update_section_title("Analytics Dashboard")
+        # matplotlib is only loaded the first time Analytics is opened
+        from views.analytics_panel import AnalyticsPanel
         AnalyticsPanel(self.get_content_frame(), self.analytics_svc)
 
     def _show_reports(self):
         self.update_section_title("Report Generation")
+        from views.reports_panel import ReportsPanel
         ReportsPanel(self.get_content_frame(), self.report_svc,
-                     self.student_svc, self.class_svc)
+                     self.student_svc, self.class_svc, self.subject_svc)
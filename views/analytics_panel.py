@@ -5,6 +5,7 @@ import tkinter as tk
 from tkinter import ttk
 from config import COLORS, FONTS
 from utils.ui_helpers import make_label
+from utils.task_runner import task_runner
 
 import matplotlib
 matplotlib.use("TkAgg")
@@ -17,6 +18,7 @@ class AnalyticsPanel(tk.Frame):
     def __init__(self, parent, analytics_svc):
         super().__init__(parent, bg=COLORS["bg_medium"])
         self.analytics_svc = analytics_svc
+        self.snapshot = None
         self.pack(fill="both", expand=True)
         self._build()
 
@@ -29,6 +31,8 @@ class AnalyticsPanel(tk.Frame):
                   bg=COLORS["primary"], fg="white", relief="flat",
                   cursor="hand2", padx=12,
                   command=self._refresh).pack(side="right")
+        self.cache_lbl = make_label(header, "", "small", fg=COLORS["text_secondary"])
+        self.cache_lbl.pack(side="right", padx=12)
 
         # Stats cards row
         self.stats_frame = tk.Frame(self, bg=COLORS["bg_medium"])
@@ -50,21 +54,29 @@ class AnalyticsPanel(tk.Frame):
         self._refresh()
 
     def _refresh(self):
+        self.cache_lbl.configure(text="Loading…")
+        task_runner().submit(self.analytics_svc.snapshot, on_done=self._render,
+                             key=(str(self), "refresh"), owner=self)
+
+    def _render(self, snapshot):
         # Clear old
         for w in self.stats_frame.winfo_children():
             w.destroy()
         for w in self.charts_frame.winfo_children():
             w.destroy()
 
-        stats = self.analytics_svc.total_stats()
-        self._build_stat_cards(stats)
+        # Every card and chart renders from this one snapshot
+        self.snapshot = snapshot
+        cache = self.analytics_svc.cache_stats()
+        self.cache_lbl.configure(text=f"Cache: {cache['hits']} hits / {cache['misses']} misses")
+        self._build_stat_cards(self.snapshot)
         self._build_charts()
 
-    def _build_stat_cards(self, stats):
+    def _build_stat_cards(self, snap):
         card_data = [
-            ("Total Students", stats["total_students"], COLORS["primary"]),
-            ("Total Results", stats["total_results"], COLORS["secondary"]),
-            ("Average Marks", f"{stats['avg_marks']}%", COLORS["success"]),
+            ("Total Students", snap.total_students, COLORS["primary"]),
+            ("Total Results", snap.total_results, COLORS["secondary"]),
+            ("Average Marks", f"{snap.avg_marks}%", COLORS["success"]),
         ]
         for i, (title, value, color) in enumerate(card_data):
             card = tk.Frame(self.stats_frame, bg=color, padx=20, pady=16)
@@ -108,7 +120,7 @@ class AnalyticsPanel(tk.Frame):
                          bg=COLORS["card"], fg=COLORS["text_secondary"]).pack(pady=10)
 
     def _plot_class_avg(self, ax, tc):
-        data = self.analytics_svc.class_average()
+        data = self.snapshot.class_averages
         if not data:
             ax.text(0.5, 0.5, "No data", ha="center", va="center", color=tc)
             return
@@ -121,7 +133,7 @@ class AnalyticsPanel(tk.Frame):
                     f"{val:.1f}", ha="center", va="bottom", color=tc, fontsize=8)
 
     def _plot_subject_avg(self, ax, tc):
-        data = self.analytics_svc.subject_average()
+        data = self.snapshot.subject_averages
         if not data:
             ax.text(0.5, 0.5, "No data", ha="center", va="center", color=tc)
             return
@@ -131,7 +143,7 @@ class AnalyticsPanel(tk.Frame):
         ax.set_xlim(0, 100)
 
     def _plot_top_students(self, ax, tc):
-        data = self.analytics_svc.top_students(5)
+        data = self.snapshot.top_students
         if not data:
             ax.text(0.5, 0.5, "No data", ha="center", va="center", color=tc)
             return
@@ -145,7 +157,7 @@ class AnalyticsPanel(tk.Frame):
                     f"{val:.1f}", ha="center", va="bottom", color=tc, fontsize=8)
 
     def _plot_pass_fail(self, ax, tc):
-        pass_c, fail_c = self.analytics_svc.pass_fail_rate()
+        pass_c, fail_c = self.snapshot.pass_count, self.snapshot.fail_count
         if pass_c + fail_c == 0:
             ax.text(0.5, 0.5, "No data", ha="center", va="center", color=tc)
             return
@@ -159,7 +171,7 @@ class AnalyticsPanel(tk.Frame):
         )
 
     def _plot_gpa_dist(self, ax, tc):
-        data = self.analytics_svc.gpa_distribution()
+        data = self.snapshot.grade_counts
         if not data:
             ax.text(0.5, 0.5, "No data", ha="center", va="center", color=tc)
             return
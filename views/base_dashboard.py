@@ -2,8 +2,10 @@
 views/base_dashboard.py - Base dashboard layout with sidebar navigation
 """
 import tkinter as tk
+from collections import OrderedDict
 from tkinter import ttk
-from config import COLORS, FONTS, APP_TITLE
+from config import COLORS, FONTS, APP_TITLE, PANEL_CACHE_SIZE
+from services.session_manager import data_changes
 
 
 class BaseDashboard(tk.Frame):
@@ -11,9 +13,17 @@ class BaseDashboard(tk.Frame):
     Base class providing a two-pane layout:
     - Left sidebar with navigation buttons
     - Right content area where sub-frames are swapped
+
+    Each section is built once into its own frame and kept alive (hidden)
+    when another section is shown, up to ``PANEL_CACHE_SIZE`` sections; the
+    least recently shown one is destroyed beyond that. A hidden section is
+    rebuilt on its next visit if any table it lists in ``SECTION_TABLES``
+    was changed in the meantime.
     """
 
     NAV_ITEMS = []  # To be overridden by subclasses: list of (label, callback)
+    # Tables each section displays, by nav label; sections not listed go stale on any change
+    SECTION_TABLES = {}
 
     def __init__(self, master, user, role, logout_callback):
         super().__init__(master, bg=COLORS["bg_medium"])
@@ -21,6 +31,7 @@ class BaseDashboard(tk.Frame):
         self.role = role
         self.logout_callback = logout_callback
         self._current_section = None
+        self._sections = OrderedDict()   # label -> [frame, title, data version]
         self.pack(fill="both", expand=True)
         self._build_layout()
         self._build_sidebar()
@@ -95,11 +106,45 @@ class BaseDashboard(tk.Frame):
         # Highlight active
         self.nav_buttons[label].configure(
             bg=COLORS["primary"], fg=COLORS["white"])
+        if label == self._current_section and label in self._sections:
+            # Clicking the open section reloads it
+            self._drop_section(label)
+        self._hide_section(self._current_section)
         self._current_section = label
-        # Clear content and call the section builder
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+
+        cached = self._sections.get(label)
+        if cached:
+            frame, title, version = cached
+            if version == data_changes.version(self.SECTION_TABLES.get(label)):
+                self._sections.move_to_end(label)
+                frame.pack(fill="both", expand=True)
+                self.update_section_title(title)
+                return
+            # Something it shows was changed elsewhere: build it again
+            self._drop_section(label)
+
+        # A fresh panel reads through a fresh session and identity map
+        sessions = getattr(self, "sessions", None)
+        if sessions:
+            sessions.reset()
+        frame = tk.Frame(self.content_frame, bg=COLORS["bg_medium"])
+        frame.pack(fill="both", expand=True)
+        self._sections[label] = [frame, "", data_changes.version(self.SECTION_TABLES.get(label))]
         callback()
+        self._sections[label][1] = self.section_title_lbl.cget("text")
+        while len(self._sections) > max(PANEL_CACHE_SIZE, 1):
+            self._drop_section(next(iter(self._sections)))
+
+    def _hide_section(self, label):
+        section = self._sections.get(label)
+        if section:
+            section[0].pack_forget()
+            # The panel kept itself current while shown; only later changes make it stale
+            section[2] = data_changes.version(self.SECTION_TABLES.get(label))
+
+    def _drop_section(self, label):
+        frame = self._sections.pop(label)[0]
+        frame.destroy()
 
     # ── Topbar ───────────────────────────────────────────────────────────────
 
@@ -125,4 +170,12 @@ class BaseDashboard(tk.Frame):
         self.section_title_lbl.configure(text=title)
 
     def get_content_frame(self):
-        return self.content_frame
+        """Frame the current section builds into."""
+        section = self._sections.get(self._current_section)
+        return section[0] if section else self.content_frame
+
+    def close_sessions(self):
+        """Close the dashboard's database sessions (called on logout)."""
+        sessions = getattr(self, "sessions", None)
+        if sessions:
+            sessions.close()
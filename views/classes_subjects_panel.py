@@ -5,7 +5,7 @@ import tkinter as tk
 from tkinter import ttk
 from config import COLORS, FONTS
 from utils.ui_helpers import (
-    scrollable_treeview, make_entry, make_label,
+    scrollable_treeview, KeyedTree, make_entry, make_label,
     confirm_delete, show_error, show_success, show_info
 )
 
@@ -88,18 +88,14 @@ class ClassesTab(tk.Frame):
         widths = [40, 160, 100, 80, 80]
         for col, w in zip(cols, widths):
             self.tree.column(col, width=w, minwidth=w)
-        self.tree.tag_configure("odd", background=COLORS["table_odd"])
-        self.tree.tag_configure("even", background=COLORS["table_even"])
+        self.rows = KeyedTree(self.tree, stripe=True)
         self.tree.bind("<<TreeviewSelect>>", self._on_select)
 
     def _load(self):
-        self.tree.delete(*self.tree.get_children())
-        for i, c in enumerate(self.class_svc.get_all()):
-            tag = "odd" if i % 2 else "even"
-            self.tree.insert("", "end", iid=str(c.id), tags=(tag,), values=(
-                c.id, c.class_name, c.academic_year,
-                len(c.students), len(c.subjects),
-            ))
+        self.rows.sync(
+            (c.id, (c.id, c.class_name, c.academic_year, len(c.students), len(c.subjects)), ())
+            for c in self.class_svc.get_all()
+        )
 
     def _on_select(self, _event):
         sel = self.tree.selection()
@@ -211,19 +207,16 @@ class SubjectsTab(tk.Frame):
         widths = [40, 200, 140, 160]
         for col, w in zip(cols, widths):
             self.tree.column(col, width=w, minwidth=w)
-        self.tree.tag_configure("odd", background=COLORS["table_odd"])
-        self.tree.tag_configure("even", background=COLORS["table_even"])
+        self.rows = KeyedTree(self.tree, stripe=True)
         self.tree.bind("<<TreeviewSelect>>", self._on_select)
 
     def _load(self):
-        self.tree.delete(*self.tree.get_children())
-        for i, s in enumerate(self.subject_svc.get_all()):
+        rows = []
+        for s in self.subject_svc.get_all():
             class_name = s.class_.class_name if s.class_ else "—"
             teacher_name = s.teacher.full_name if s.teacher else "—"
-            tag = "odd" if i % 2 else "even"
-            self.tree.insert("", "end", iid=str(s.id), tags=(tag,), values=(
-                s.id, s.subject_name, class_name, teacher_name,
-            ))
+            rows.append((s.id, (s.id, s.subject_name, class_name, teacher_name), ()))
+        self.rows.sync(rows)
 
     def _on_select(self, _event):
         sel = self.tree.selection()
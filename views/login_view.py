@@ -10,9 +10,20 @@ from services.student_service import StudentService
 
 
 class LoginView(tk.Toplevel):
-    def __init__(self, master, on_login_success):
+    """
+    Login and registration window.
+
+    It is shown before the database is ready: buttons that need the
+    database stay disabled until ``set_status(ready=True)`` and the status
+    line at the bottom says what startup is doing or why it failed.
+    """
+
+    def __init__(self, master, on_login_success, on_retry=None):
         super().__init__(master)
         self.on_login_success = on_login_success
+        self.on_retry = on_retry
+        self._ready = False
+        self._db_buttons = []
         self.title("Login — " + APP_TITLE)
         self.resizable(True, True)
         self.configure(bg=COLORS["bg_dark"])
@@ -28,7 +39,18 @@ class LoginView(tk.Toplevel):
 
     def _build(self):
         bg = COLORS["bg_dark"]
-        
+
+        # Startup status line, kept below whichever card is shown
+        status_bar = tk.Frame(self, bg=bg, padx=40, pady=8)
+        status_bar.pack(side="bottom", fill="x")
+        self.status_lbl = tk.Label(status_bar, text="Connecting to database…", font=FONTS["small"],
+                                   bg=bg, fg=COLORS["text_secondary"], anchor="w",
+                                   justify="left", wraplength=330)
+        self.status_lbl.pack(side="left", fill="x", expand=True)
+        self.retry_btn = tk.Button(status_bar, text="Retry", font=FONTS["small"],
+                                   bg=COLORS["secondary"], fg="white", relief="flat",
+                                   cursor="hand2", command=self._retry)
+
         # Main container
         self.outer = tk.Frame(self, bg=bg, padx=40, pady=30)
         self.outer.pack(fill="both", expand=True)
@@ -44,6 +66,29 @@ class LoginView(tk.Toplevel):
         # Show welcome card initially
         self._show_welcome_card()
 
+    def set_status(self, ready: bool, message: str, error: bool = False):
+        """Enable or disable the database-backed buttons and show ``message``."""
+        self._ready = ready
+        color = COLORS["danger"] if error else (COLORS["success"] if ready else COLORS["text_secondary"])
+        self.status_lbl.configure(text=message, fg=color)
+        if error and self.on_retry:
+            self.retry_btn.pack(side="right")
+        else:
+            self.retry_btn.pack_forget()
+        self._db_buttons = [b for b in self._db_buttons if b.winfo_exists()]
+        for btn in self._db_buttons:
+            btn.configure(state="normal" if ready else "disabled")
+
+    def _db_button(self, btn):
+        """Register a button that needs the database; disabled until ready."""
+        self._db_buttons.append(btn)
+        btn.configure(state="normal" if self._ready else "disabled")
+        return btn
+
+    def _retry(self):
+        self.set_status(False, "Connecting to database…")
+        self.on_retry()
+
     def _clear_outer(self):
         """Clear content inside outer frame"""
         for widget in self.outer.winfo_children():
@@ -172,7 +217,7 @@ class LoginView(tk.Toplevel):
             relief="flat", cursor="hand2", pady=10,
             command=self._do_login,
         )
-        login_btn.pack(fill="x")
+        self._db_button(login_btn).pack(fill="x")
 
         self.bind("<Return>", lambda e: self._do_login())
         self.user_entry.focus_set()
@@ -265,7 +310,7 @@ class LoginView(tk.Toplevel):
             relief="flat", cursor="hand2", pady=10,
             command=lambda: self._do_register(user_type, name_var, email_var, pass_var, confirm_var),
         )
-        register_btn.pack(fill="x")
+        self._db_button(register_btn).pack(fill="x")
 
     def _build_student_fields(self, card, color):
         """Build fields for student registration"""
@@ -327,9 +372,12 @@ class LoginView(tk.Toplevel):
             relief="flat", cursor="hand2", pady=10,
             command=lambda: self._do_student_register(adm_var, first_var, last_var, gender_var, pass_var, confirm_var),
         )
-        register_btn.pack(fill="x")
+        self._db_button(register_btn).pack(fill="x")
 
     def _do_login(self):
+        if not self._ready:
+            # <Return> still reaches here while the button is disabled
+            return
         user_input = self.user_var.get().strip()
         password = self.pass_var.get().strip()
         
@@ -5,15 +5,17 @@ import os
 import tkinter as tk
 from tkinter import ttk, filedialog
 from config import COLORS, FONTS
-from utils.ui_helpers import make_label, show_error, show_success, show_info
+from utils.ui_helpers import make_label, show_error, show_success, show_info, KeyedTree, Debouncer
+from utils.task_runner import task_runner
 
 
 class ReportsPanel(tk.Frame):
-    def __init__(self, parent, report_svc, student_svc, class_svc):
+    def __init__(self, parent, report_svc, student_svc, class_svc, subject_svc=None):
         super().__init__(parent, bg=COLORS["bg_medium"])
         self.report_svc = report_svc
         self.student_svc = student_svc
         self.class_svc = class_svc
+        self.subject_svc = subject_svc
         self.pack(fill="both", expand=True)
         self._build()
 
@@ -42,7 +44,7 @@ class ReportsPanel(tk.Frame):
         self._report_card(
             cards,
             "Export All Results (CSV)",
-            "Export the entire results database to a CSV file.",
+            "Export results to CSV (optionally gzipped), filtered by class, subject or year.",
             self._export_csv,
         ).grid(row=0, column=2, padx=8, pady=8, sticky="nsew")
 
@@ -62,6 +64,9 @@ class ReportsPanel(tk.Frame):
         e = make_entry(sel_frame, textvariable=self.student_search_var, width=28)
         e.configure(bg=COLORS["bg_medium"])
         e.grid(row=1, column=1, padx=(0, 12))
+        self._search_debounce = Debouncer(self, self._search_students)
+        self.student_search_var.trace_add("write", lambda *a: self._search_debounce())
+        e.bind("<Return>", lambda ev: self._search_debounce.flush())
         tk.Button(sel_frame, text="Search", font=FONTS["body"],
                   bg=COLORS["secondary"], fg="white", relief="flat",
                   cursor="hand2", padx=12,
@@ -77,8 +82,7 @@ class ReportsPanel(tk.Frame):
         widths = [40, 100, 180, 120]
         for col, w in zip(cols, widths):
             self.stree.column(col, width=w, minwidth=w)
-        self.stree.tag_configure("odd", background=COLORS["table_odd"])
-        self.stree.tag_configure("even", background=COLORS["table_even"])
+        self.student_rows = KeyedTree(self.stree, stripe=True)
 
         tk.Button(sel_frame, text="Generate Report Card PDF",
                   font=FONTS["body_bold"], bg=COLORS["primary"],
@@ -101,6 +105,69 @@ class ReportsPanel(tk.Frame):
                   fg="white", relief="flat", cursor="hand2", padx=16, pady=6,
                   command=self._gen_class_report).pack(side="left")
 
+        # Batch report cards
+        batch_frame = tk.Frame(self, bg=COLORS["card"], padx=20, pady=16)
+        batch_frame.pack(fill="x", padx=16, pady=8)
+        make_label(batch_frame, "Batch Report Cards — Class, Year or Whole School", "body_bold").pack(
+            anchor="w", pady=(0, 8))
+        self._batch_scopes = {"Whole School": {}}
+        for c in classes:
+            self._batch_scopes[f"Class: {c.class_name} ({c.academic_year})"] = {"class_id": c.id}
+        for year in sorted({c.academic_year for c in classes}):
+            self._batch_scopes[f"Year: {year}"] = {"academic_year": year}
+        self.batch_var = tk.StringVar(value="Whole School")
+        ttk.Combobox(batch_frame, textvariable=self.batch_var,
+                     values=list(self._batch_scopes.keys()), width=30, state="readonly").pack(side="left", padx=(0, 12))
+        self.batch_zip_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(batch_frame, text="Save as ZIP", variable=self.batch_zip_var,
+                       font=FONTS["body"], bg=COLORS["card"], fg=COLORS["text_primary"],
+                       selectcolor=COLORS["bg_medium"], activebackground=COLORS["card"]).pack(side="left", padx=(0, 12))
+        tk.Button(batch_frame, text="Generate Report Cards",
+                  font=FONTS["body_bold"], bg=COLORS["primary"],
+                  fg="white", relief="flat", cursor="hand2", padx=16, pady=6,
+                  command=self._gen_batch_reports).pack(side="left")
+
+        # CSV export filters
+        exp_frame = tk.Frame(self, bg=COLORS["card"], padx=20, pady=16)
+        exp_frame.pack(fill="x", padx=16, pady=8)
+        make_label(exp_frame, "Export Results (CSV) — Filters", "body_bold").pack(anchor="w", pady=(0, 8))
+        self._export_classes = {"All Classes": None}
+        self._export_classes.update({f"{c.class_name} ({c.academic_year})": c.id for c in classes})
+        self._export_years = {"All Years": None}
+        self._export_years.update({y: y for y in sorted({c.academic_year for c in classes})})
+        self._export_subjects = {"All Subjects": None}
+        if self.subject_svc:
+            class_names = {c.id: c.class_name for c in classes}
+            self._export_subjects.update({
+                f"{s.subject_name} ({class_names[s.class_id]})" if s.class_id in class_names
+                else s.subject_name: s.id
+                for s in self.subject_svc.get_all()
+            })
+        self.exp_class_var = tk.StringVar(value="All Classes")
+        self.exp_subject_var = tk.StringVar(value="All Subjects")
+        self.exp_year_var = tk.StringVar(value="All Years")
+        for var, options in ((self.exp_class_var, self._export_classes),
+                             (self.exp_subject_var, self._export_subjects),
+                             (self.exp_year_var, self._export_years)):
+            ttk.Combobox(exp_frame, textvariable=var, values=list(options.keys()),
+                         width=22, state="readonly").pack(side="left", padx=(0, 8))
+        self.exp_gzip_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(exp_frame, text="Gzip", variable=self.exp_gzip_var,
+                       font=FONTS["body"], bg=COLORS["card"], fg=COLORS["text_primary"],
+                       selectcolor=COLORS["bg_medium"], activebackground=COLORS["card"]).pack(side="left", padx=(0, 12))
+        tk.Button(exp_frame, text="Export CSV",
+                  font=FONTS["body_bold"], bg=COLORS["primary"],
+                  fg="white", relief="flat", cursor="hand2", padx=16, pady=6,
+                  command=self._export_csv).pack(side="left")
+        self.exp_partition_var = tk.BooleanVar(value=False)
+        tk.Button(exp_frame, text="Export Parquet",
+                  font=FONTS["body_bold"], bg=COLORS["secondary"],
+                  fg="white", relief="flat", cursor="hand2", padx=16, pady=6,
+                  command=self._export_parquet).pack(side="left", padx=(8, 0))
+        tk.Checkbutton(exp_frame, text="Partition by year/class", variable=self.exp_partition_var,
+                       font=FONTS["body"], bg=COLORS["card"], fg=COLORS["text_primary"],
+                       selectcolor=COLORS["bg_medium"], activebackground=COLORS["card"]).pack(side="left", padx=(8, 0))
+
     def _report_card(self, parent, title, desc, cmd):
         card = tk.Frame(parent, bg=COLORS["card"], padx=16, pady=18,
                         highlightbackground=COLORS["border"], highlightthickness=1)
@@ -114,15 +181,25 @@ class ReportsPanel(tk.Frame):
                   cursor="hand2", padx=12, pady=4, command=cmd).pack(anchor="w")
         return card
 
+    def _run(self, fn, *args, on_done, **kwargs):
+        """Generate in the background; failures are reported with show_error.
+
+        No owner is set, so the outcome is still reported after navigating away.
+        """
+        task_runner().submit(fn, *args, on_done=on_done, **kwargs)
+
     def _search_students(self):
+        self._search_debounce.cancel()
         query = self.student_search_var.get().strip()
-        students, _ = self.student_svc.search(query, page=1, page_size=50)
-        self.stree.delete(*self.stree.get_children())
-        for i, s in enumerate(students):
+        task_runner().submit(self.student_svc.fuzzy_search, query, limit=50,
+                             on_done=self._show_students, key=(str(self), "search"), owner=self)
+
+    def _show_students(self, students):
+        rows = []
+        for s in students:
             class_name = s.class_.class_name if s.class_ else "—"
-            tag = "odd" if i % 2 else "even"
-            self.stree.insert("", "end", iid=str(s.id), tags=(tag,), values=(
-                s.id, s.admission_number, s.full_name, class_name))
+            rows.append((s.id, (s.id, s.admission_number, s.full_name, class_name), ()))
+        self.student_rows.sync(rows)
 
     def _gen_student_report(self):
         sel = self.stree.selection()
@@ -130,19 +207,16 @@ class ReportsPanel(tk.Frame):
             show_info("Select", "Please select a student from the table.")
             return
         student_id = int(sel[0])
-        student = self.student_svc.get_by_id(student_id)
+        admission_number = self.stree.item(sel[0], "values")[1]
         filepath = filedialog.asksaveasfilename(
             defaultextension=".pdf",
             filetypes=[("PDF Files", "*.pdf")],
-            initialfile=f"report_card_{student.admission_number}.pdf",
+            initialfile=f"report_card_{admission_number}.pdf",
         )
         if not filepath:
             return
-        try:
-            self.report_svc.generate_student_report_card(student_id, filepath)
-            show_success("Generated", f"Report card saved to:\n{filepath}")
-        except Exception as e:
-            show_error("Error", str(e))
+        self._run(self.report_svc.generate_student_report_card, student_id, filepath,
+                  on_done=lambda _: show_success("Generated", f"Report card saved to:\n{filepath}"))
 
     def _gen_class_report(self):
         class_label = self.cls_var.get()
@@ -157,22 +231,71 @@ class ReportsPanel(tk.Frame):
         )
         if not filepath:
             return
-        try:
-            self.report_svc.generate_class_report_pdf(class_id, filepath)
-            show_success("Generated", f"Class report saved to:\n{filepath}")
-        except Exception as e:
-            show_error("Error", str(e))
+        self._run(self.report_svc.generate_class_report_pdf, class_id, filepath,
+                  on_done=lambda _: show_success("Generated", f"Class report saved to:\n{filepath}"))
+
+    def _gen_batch_reports(self):
+        scope_label = self.batch_var.get()
+        scope = self._batch_scopes.get(scope_label, {})
+        as_zip = self.batch_zip_var.get()
+        if as_zip:
+            output = filedialog.asksaveasfilename(
+                defaultextension=".zip",
+                filetypes=[("ZIP Archives", "*.zip")],
+                initialfile=f"report_cards_{scope_label.replace(' ', '_').replace(':', '')}.zip",
+            )
+        else:
+            output = filedialog.askdirectory(title="Folder for report cards")
+        if not output:
+            return
+        self._run(self.report_svc.generate_report_cards, output, as_zip=as_zip,
+                  on_done=lambda summary: self._batch_done(output, summary), **scope)
+
+    def _batch_done(self, output, summary):
+        message = (f"{summary['generated']} report card(s) saved to:\n{output}\n\n"
+                   f"{summary['seconds']:.1f}s ({summary['cards_per_second']:.1f} cards/s)")
+        if summary["failed"]:
+            shown = "\n".join(f"{adm}: {err}" for adm, err in summary["failed"][:10])
+            more = len(summary["failed"]) - 10
+            show_error("Some Cards Failed",
+                       f"{message}\n\n{len(summary['failed'])} failed:\n{shown}"
+                       + (f"\n... and {more} more (see log)" if more > 0 else ""))
+        else:
+            show_success("Generated", message)
+
+    def _export_filters(self):
+        return dict(
+            class_id=self._export_classes.get(self.exp_class_var.get()),
+            subject_id=self._export_subjects.get(self.exp_subject_var.get()),
+            academic_year=self._export_years.get(self.exp_year_var.get()),
+        )
+
+    def _export_parquet(self):
+        partition = self.exp_partition_var.get()
+        if partition:
+            path = filedialog.askdirectory(title="Folder for partitioned Parquet export")
+        else:
+            path = filedialog.asksaveasfilename(
+                defaultextension=".parquet",
+                filetypes=[("Parquet Files", "*.parquet")],
+                initialfile="results_export.parquet",
+            )
+        if not path:
+            return
+        self._run(self.report_svc.export_results_parquet, path, partition=partition,
+                  on_done=lambda count: show_success("Exported", f"{count} result(s) exported to:\n{path}"),
+                  **self._export_filters())
 
     def _export_csv(self):
+        compress = self.exp_gzip_var.get()
+        ext = ".csv.gz" if compress else ".csv"
         filepath = filedialog.asksaveasfilename(
-            defaultextension=".csv",
-            filetypes=[("CSV Files", "*.csv")],
-            initialfile="results_export.csv",
+            defaultextension=ext,
+            filetypes=[("Gzipped CSV", "*.csv.gz")] if compress else [("CSV Files", "*.csv")],
+            initialfile=f"results_export{ext}",
         )
         if not filepath:
             return
-        try:
-            self.report_svc.export_results_csv(filepath)
-            show_success("Exported", f"Results exported to:\n{filepath}")
-        except Exception as e:
-            show_error("Error", str(e))
+        self._run(self.report_svc.export_results_csv, filepath, compress=compress,
+                  on_done=lambda _: show_success("Exported", f"Results exported to:\n{filepath}"),
+                  **self._export_filters())
@@ -1,23 +1,26 @@
 """
 views/results_panel.py - Results entry and display with real-time refresh
 """
+import os
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, filedialog
 from config import COLORS, FONTS
 from utils.ui_helpers import (
-    scrollable_treeview, make_entry, make_label,
+    VirtualTable, make_entry, make_label,
     show_error, show_success, show_info, confirm_delete
 )
+from utils.task_runner import task_runner
 
 
 class ResultsPanel(tk.Frame):
     def __init__(self, parent, result_svc, student_svc, subject_svc, class_svc,
-                 teacher=None):
+                 teacher=None, import_svc=None):
         super().__init__(parent, bg=COLORS["bg_medium"])
         self.result_svc = result_svc
         self.student_svc = student_svc
         self.subject_svc = subject_svc
         self.class_svc = class_svc
+        self.import_svc = import_svc
         self.teacher = teacher  # If set, restrict to teacher's subjects
         self.pack(fill="both", expand=True)
         self._build()
@@ -93,12 +96,19 @@ class ResultsPanel(tk.Frame):
                   bg=COLORS["danger"], fg="white", relief="flat",
                   cursor="hand2", padx=10,
                   command=self._delete_result).pack(side="right")
+        if self.import_svc:
+            tk.Button(toolbar, text="Import CSV", font=FONTS["body"],
+                      bg=COLORS["secondary"], fg="white", relief="flat",
+                      cursor="hand2", padx=10,
+                      command=self._import_csv).pack(side="right", padx=6)
 
         # Table
         cols = ("id", "adm", "student", "class_", "subject", "marks", "grade", "gpa", "remarks")
         headings = ("ID", "Adm No", "Student", "Class", "Subject", "Marks", "Grade", "GPA", "Remarks")
-        frame, self.tree = scrollable_treeview(self, cols, headings, height=22)
-        frame.pack(fill="both", expand=True, padx=16, pady=(0, 8))
+        # Only the rows in view are materialised, however many results are loaded
+        self.table = VirtualTable(self, cols, headings, height=22)
+        self.table.pack(fill="both", expand=True, padx=16, pady=(0, 8))
+        self.tree = self.table.tree
 
         widths = [40, 90, 160, 110, 130, 60, 60, 60, 100]
         for col, w in zip(cols, widths):
@@ -109,8 +119,9 @@ class ResultsPanel(tk.Frame):
         self.tree.tag_configure("C", foreground="#ffa726")
         self.tree.tag_configure("D", foreground="#ef5350")
         self.tree.tag_configure("F", foreground=COLORS["danger"])
-        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.table.bind("<<TreeviewSelect>>", self._on_select)
         self._selected_result_id = None
+        self._ids = []
 
     def _get_available_subjects(self):
         if self.teacher:
@@ -121,33 +132,34 @@ class ResultsPanel(tk.Frame):
 
     def _load(self):
         class_name = self.filter_class_var.get() if hasattr(self, "filter_class_var") else "All"
-        if class_name != "All":
-            class_id = self._class_map_filter.get(class_name)
-            results = self.result_svc.get_class_results(class_id)
-        else:
-            results = self.result_svc.get_all()
-        self._populate(results)
-
-    def _populate(self, results):
-        self.tree.delete(*self.tree.get_children())
-        for r in results:
-            student = r.student
-            class_name = student.class_.class_name if student and student.class_ else "—"
-            subject_name = r.subject.subject_name if r.subject else "—"
-            self.tree.insert("", "end", iid=str(r.id), tags=(r.grade,), values=(
-                r.id,
-                student.admission_number if student else "—",
-                student.full_name if student else "—",
-                class_name,
-                subject_name,
-                f"{r.marks:.1f}",
-                r.grade,
-                f"{r.gpa:.1f}",
-                r.remarks,
-            ))
+        class_id = self._class_map_filter.get(class_name) if class_name != "All" else None
+        # Only the ids are loaded up front; rows are fetched as they scroll into view
+        task_runner().submit(self.result_svc.list_ids, class_id=class_id,
+                             on_done=self._populate, key=(str(self), "load"), owner=self)
+
+    def _populate(self, ids):
+        self._ids = ids
+        self._selected_result_id = None
+        # Blocks are queried on the task runner; placeholders show until they arrive
+        self.table.set_source(len(ids), self._fetch_rows, background=True)
+
+    def _fetch_rows(self, offset, limit):
+        # Runs on a worker thread
+        rows = self.result_svc.rows_by_ids(self._ids[offset:offset + limit])
+        return [(str(r.id), (
+            r.id,
+            r.admission_number,
+            r.student_name,
+            r.class_name or "—",
+            r.subject_name,
+            f"{r.marks:.1f}",
+            r.grade,
+            f"{r.gpa:.1f}",
+            r.remarks,
+        ), (r.grade,)) for r in rows]
 
     def _on_select(self, _event):
-        sel = self.tree.selection()
+        sel = self.table.selection()
         if not sel:
             self._selected_result_id = None
             return
@@ -180,13 +192,10 @@ class ResultsPanel(tk.Frame):
             subject_id = self._subject_map.get(subject_name)
             result = self.result_svc.add_result(student.id, subject_id, marks)
             show_success("Saved", f"Marks saved: {result.marks} — Grade {result.grade}")
-            # Real-time append to tree
-            class_name = student.class_.class_name if student.class_ else "—"
-            self.tree.insert("", 0, iid=str(result.id), tags=(result.grade,), values=(
-                result.id, student.admission_number, student.full_name,
-                class_name, subject_name, f"{result.marks:.1f}",
-                result.grade, f"{result.gpa:.1f}", result.remarks,
-            ))
+            # Real-time prepend to the table
+            self._ids.insert(0, result.id)
+            self.table.invalidate(len(self._ids))
+            self.table.scroll_to(0)
         except ValueError as e:
             show_error("Error", str(e))
         except Exception as e:
@@ -200,15 +209,15 @@ class ResultsPanel(tk.Frame):
             marks = float(self.marks_var.get().strip())
             result = self.result_svc.update_result(self._selected_result_id, marks)
             show_success("Updated", f"Marks updated: {result.marks} — Grade {result.grade}")
-            # Update row in-place
-            student = result.student
-            subject_name = result.subject.subject_name if result.subject else "—"
-            class_name = student.class_.class_name if student and student.class_ else "—"
-            self.tree.item(str(result.id), tags=(result.grade,), values=(
-                result.id, student.admission_number, student.full_name,
-                class_name, subject_name, f"{result.marks:.1f}",
-                result.grade, f"{result.gpa:.1f}", result.remarks,
-            ))
+            # Update row in-place, reusing the joined columns already displayed
+            iid = str(result.id)
+            row = self.table.row(iid)
+            if row:
+                values = list(row[0])
+                values[5:9] = [f"{result.marks:.1f}", result.grade, f"{result.gpa:.1f}", result.remarks]
+                self.table.update_row(iid, values, (result.grade,))
+            else:
+                self.table.invalidate()
         except Exception as e:
             show_error("Error", str(e))
 
@@ -219,8 +228,36 @@ class ResultsPanel(tk.Frame):
         if confirm_delete("this result"):
             try:
                 self.result_svc.delete_result(self._selected_result_id)
-                self.tree.delete(str(self._selected_result_id))
+                self._ids.remove(self._selected_result_id)
+                self.table.clear_selection()
+                self.table.invalidate(len(self._ids))
                 self._selected_result_id = None
                 show_success("Deleted", "Result deleted.")
             except Exception as e:
                 show_error("Error", str(e))
+
+    def _import_csv(self):
+        filepath = filedialog.askopenfilename(
+            title="Import Marks (admission_number, subject, marks)",
+            filetypes=[("CSV Files", "*.csv")],
+        )
+        if not filepath:
+            return
+        allowed = list(self._subject_map.values()) if self.teacher else None
+        task_runner().submit(
+            self.import_svc.import_results_csv, filepath, allowed_subject_ids=allowed,
+            on_done=lambda report: self._import_done(filepath, report),
+            on_error=lambda e: show_error("Import Failed", str(e)),
+            owner=self,
+        )
+
+    def _import_done(self, filepath, report):
+        message = (f"Inserted: {report['inserted']}\n"
+                   f"Skipped (already entered): {report['skipped']}\n"
+                   f"Rows with errors: {len(report['errors'])}")
+        if report["errors"]:
+            root, _ = os.path.splitext(filepath)
+            error_path = self.import_svc.write_error_report(report["errors"], f"{root}_errors.csv")
+            message += f"\n\nError report saved to:\n{error_path}"
+        show_success("Import Complete", message)
+        self._load()
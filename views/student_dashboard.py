@@ -3,16 +3,17 @@ views/student_dashboard.py - Student dashboard (restricted view)
 """
 import tkinter as tk
 from tkinter import ttk
-from config import COLORS, FONTS
+from config import COLORS, FONTS, PASS_MARK
+from models.grade_scale import grade_scale
 from views.base_dashboard import BaseDashboard
-from services import ResultService, SubjectService, ClassService
-from config import SessionLocal
+from services import ResultService, SubjectService, ClassService, SummaryService, SessionManager
 
 
 class StudentDashboard(BaseDashboard):
     def __init__(self, master, user, logout_callback):
         self._user = user
         self._logout_callback = logout_callback
+        self.sessions = SessionManager(schedule=master.after_idle)
         self._init_services(user)
         self.NAV_ITEMS = [
             ("My Results", self._show_results),
@@ -22,17 +23,19 @@ class StudentDashboard(BaseDashboard):
         self._nav_click("My Results", self._show_results)
 
     def _init_services(self, user):
-        # Create separate session for each service to prevent transaction issues
-        self.result_svc = ResultService(SessionLocal())
-        self.subject_svc = SubjectService(SessionLocal())
-        self.class_svc = ClassService(SessionLocal())
+        # All services share the dashboard's scoped session
+        db = self.sessions.session
+        self.result_svc = ResultService(db)
+        self.subject_svc = SubjectService(db)
+        self.class_svc = ClassService(db)
+        self.summary_svc = SummaryService(db)
 
     def _show_results(self):
         self.update_section_title("My Results")
         f = self.get_content_frame()
         
         # Get student's results
-        results = self.result_svc.get_by_student(self.user.id)
+        results = self.result_svc.list_rows(student_id=self.user.id)
         
         # Header
         header = tk.Frame(f, bg=COLORS["bg_medium"], pady=16)
@@ -50,18 +53,23 @@ class StudentDashboard(BaseDashboard):
                      fg=COLORS["text_secondary"]).pack(padx=20, pady=20)
             return
 
-        # Calculate overall stats
-        total_marks = sum(r.marks for r in results)
-        avg_marks = total_marks / len(results) if results else 0
-        passed = sum(1 for r in results if r.marks >= 50)
+        # Overall stats come from the maintained summary row; until one has
+        # been written, aggregate the rows just loaded
+        summary = self.summary_svc.get(self.user.id)
+        if summary:
+            count, avg_marks, passed = summary.result_count, summary.avg_marks, summary.pass_count
+        else:
+            count = len(results)
+            avg_marks = sum(r.marks for r in results) / count
+            passed = sum(1 for r in results if r.marks >= PASS_MARK)
         
         # Stats cards
         cards_row = tk.Frame(f, bg=COLORS["bg_medium"])
         cards_row.pack(fill="x", padx=20, pady=12)
         stat_items = [
-            ("Total Subjects", str(len(results)), COLORS["primary"]),
+            ("Total Subjects", str(count), COLORS["primary"]),
             ("Average Score", f"{avg_marks:.1f}%", COLORS["secondary"]),
-            ("Subjects Passed", f"{passed}/{len(results)}", COLORS["success"]),
+            ("Subjects Passed", f"{passed}/{count}", COLORS["success"]),
         ]
         for i, (label, val, color) in enumerate(stat_items):
             card = tk.Frame(cards_row, bg=color, padx=20, pady=16)
@@ -92,29 +100,13 @@ class StudentDashboard(BaseDashboard):
         scrollbar.pack(side="right", fill="y")
         tree.configure(yscrollcommand=scrollbar.set)
 
-        # Grade scale
-        grade_scale = [
-            (80, 100, "A", "Distinction"),
-            (70, 79, "B", "Credit"),
-            (60, 69, "C", "Merit"),
-            (50, 59, "D", "Pass"),
-            (0, 49, "F", "Fail"),
-        ]
-
         for r in results:
-            subject = r.subject.subject_name if r.subject else "N/A"
-            class_name = r.subject.class_.class_name if r.subject and r.subject.class_ else "N/A"
+            subject = r.subject_name
+            # Class the subject is taught in, not the student's current class
+            class_name = r.subject_class_name or "N/A"
             marks = r.marks
-            
-            # Determine grade
-            grade = "F"
-            remarks = "Fail"
-            for min_val, max_val, g, rem in grade_scale:
-                if min_val <= marks <= max_val:
-                    grade = g
-                    remarks = rem
-                    break
-            
+            grade, _, remarks = grade_scale.lookup(marks)
+
             tree.insert("", "end", values=(subject, class_name, f"{marks}", grade, remarks))
 
     def _show_profile(self):
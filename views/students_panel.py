@@ -3,16 +3,21 @@ views/students_panel.py - Student Management CRUD panel
 """
 import tkinter as tk
 from tkinter import ttk, messagebox
+import time
+from collections import OrderedDict
 from datetime import datetime
-from config import COLORS, FONTS
+from config import COLORS, FONTS, SEARCH_CACHE_SIZE
 from utils.ui_helpers import (
-    scrollable_treeview, make_entry, make_label,
+    scrollable_treeview, KeyedTree, Debouncer, make_entry, make_label,
     confirm_delete, show_error, show_success, show_info
 )
+from utils.task_runner import task_runner
 
 
 class StudentsPanel(tk.Frame):
     PAGE_SIZE = 20
+    # Seconds a cached first page is reused while the search text changes
+    SEARCH_CACHE_TTL = 60
 
     def __init__(self, parent, student_svc, class_svc):
         super().__init__(parent, bg=COLORS["bg_medium"])
@@ -20,7 +25,13 @@ class StudentsPanel(tk.Frame):
         self.class_svc = class_svc
         self._page = 1
         self._total = 0
+        self._cursor = None          # cursor the current page was read from
+        self._direction = "next"
+        self._prev_cursor = None
+        self._next_cursor = None
         self._selected_id = None
+        self._load_task = None
+        self._search_cache = OrderedDict()   # (query, class_id) -> (time, page)
         self.pack(fill="both", expand=True)
         self._build()
         self._load()
@@ -35,9 +46,11 @@ class StudentsPanel(tk.Frame):
         make_label(toolbar, "Student Management", "subheading").pack(side="left")
 
         self.search_var = tk.StringVar()
-        self.search_var.trace_add("write", lambda *a: self._on_search())
+        self._search_debounce = Debouncer(self, self._on_search)
+        self.search_var.trace_add("write", lambda *a: self._search_debounce())
         search_entry = make_entry(toolbar, textvariable=self.search_var, width=26)
         search_entry.configure(bg=COLORS["bg_light"])
+        search_entry.bind("<Return>", lambda e: self._search_debounce.flush())
         search_entry.pack(side="left", padx=(24, 6))
         make_label(toolbar, "Search:", "body").pack(side="left", padx=(0, 2))
 
@@ -71,9 +84,8 @@ class StudentsPanel(tk.Frame):
         for col, w in zip(cols, widths):
             self.tree.column(col, width=w, minwidth=w)
 
-        # Row colour tags
-        self.tree.tag_configure("odd", background=COLORS["table_odd"])
-        self.tree.tag_configure("even", background=COLORS["table_even"])
+        # Rows, striped by position
+        self.rows = KeyedTree(self.tree, stripe=True)
         self.tree.bind("<<TreeviewSelect>>", self._on_select)
 
         # Pagination bar
@@ -104,51 +116,97 @@ class StudentsPanel(tk.Frame):
         if self.class_var.get() not in values:
             self.class_var.set("All")
 
-    def _load(self):
+    def _load(self, count: bool = True):
         query = self.search_var.get().strip() if hasattr(self, "search_var") else ""
         class_name = self.class_var.get() if hasattr(self, "class_var") else "All"
         class_id = self._class_map.get(class_name) if class_name != "All" else None
-        students, total = self.student_svc.search(query, class_id, self._page, self.PAGE_SIZE)
-        self._total = total
-        self._populate(students)
-        pages = max(1, (total + self.PAGE_SIZE - 1) // self.PAGE_SIZE)
+        # Paging is disabled until this page arrives; a newer search supersedes it
+        self._prev_cursor = self._next_cursor = None
+        if self._load_task is not None:
+            self._load_task.cancel()
+            self._load_task = None
+        cache_key = (query, class_id) if self._cursor is None and count else None
+        if cache_key is not None:
+            cached = self._search_cache.get(cache_key)
+            if cached and time.monotonic() - cached[0] < self.SEARCH_CACHE_TTL:
+                self._search_cache.move_to_end(cache_key)
+                self._show_page(cached[1])
+                return
+        self._load_task = task_runner().submit(
+            self._fetch_page, query, class_id, self._cursor, self._direction,
+            "estimate" if count else None,
+            on_done=lambda page: self._page_loaded(cache_key, page),
+            key=(str(self), "load"), owner=self)
+
+    def _fetch_page(self, query, class_id, cursor, direction, total):
+        """Runs on a worker thread: one page of students plus their result counts."""
+        students, total, prev_cursor, next_cursor = self.student_svc.search_keyset(
+            query, class_id, cursor=cursor, direction=direction,
+            page_size=self.PAGE_SIZE, total=total)
+        counts = self.student_svc.result_counts(s.id for s in students)
+        return students, total, prev_cursor, next_cursor, counts
+
+    def _page_loaded(self, cache_key, page):
+        self._load_task = None
+        if cache_key is not None:
+            self._search_cache[cache_key] = (time.monotonic(), page)
+            self._search_cache.move_to_end(cache_key)
+            while len(self._search_cache) > SEARCH_CACHE_SIZE:
+                self._search_cache.popitem(last=False)
+        self._show_page(page)
+
+    def _show_page(self, page):
+        students, total, self._prev_cursor, self._next_cursor, counts = page
+        if total is not None:
+            self._total = total
+        self._populate(students, counts)
+        pages = max(1, (self._total + self.PAGE_SIZE - 1) // self.PAGE_SIZE)
         self.page_lbl.configure(
-            text=f"Showing {len(students)} of {total}  |  Page {self._page}/{pages}")
+            text=f"Showing {len(students)} of {self._total}  |  Page {self._page}/{pages}")
 
-    def _populate(self, students):
-        self.tree.delete(*self.tree.get_children())
-        for i, s in enumerate(students):
+    def _populate(self, students, counts):
+        rows = []
+        for s in students:
             class_name = s.class_.class_name if s.class_ else "—"
-            tag = "odd" if i % 2 else "even"
-            self.tree.insert("", "end", iid=str(s.id), tags=(tag,), values=(
+            rows.append((s.id, (
                 s.admission_number, s.full_name, s.gender,
-                str(s.date_of_birth or "—"), class_name, len(s.results),
-            ))
+                str(s.date_of_birth or "—"), class_name, counts.get(s.id, 0),
+            ), ()))
+        self.rows.sync(rows)
 
     def _on_select(self, _event):
         sel = self.tree.selection()
         self._selected_id = int(sel[0]) if sel else None
 
+    def _reload(self):
+        """Reload after a change made here; cached search pages are stale."""
+        self._search_cache.clear()
+        self._load()
+
     def _on_search(self):
+        self._search_debounce.cancel()
         self._page = 1
+        self._cursor = None
+        self._direction = "next"
         self._load()
 
     def _prev_page(self):
-        if self._page > 1:
+        if self._prev_cursor:
             self._page -= 1
-            self._load()
+            self._cursor, self._direction = self._prev_cursor, "prev"
+            self._load(count=False)
 
     def _next_page(self):
-        pages = max(1, (self._total + self.PAGE_SIZE - 1) // self.PAGE_SIZE)
-        if self._page < pages:
+        if self._next_cursor:
             self._page += 1
-            self._load()
+            self._cursor, self._direction = self._next_cursor, "next"
+            self._load(count=False)
 
     # ── CRUD dialogs ──────────────────────────────────────────────────────────
 
     def _open_add(self):
         StudentFormDialog(self, self.student_svc, self.class_svc,
-                          on_save=self._load)
+                          on_save=self._reload)
 
     def _open_edit(self):
         if not self._selected_id:
@@ -159,7 +217,7 @@ class StudentsPanel(tk.Frame):
             show_error("Not Found", "Student not found.")
             return
         StudentFormDialog(self, self.student_svc, self.class_svc,
-                          student=student, on_save=self._load)
+                          student=student, on_save=self._reload)
 
     def _do_delete(self):
         if not self._selected_id:
@@ -172,7 +230,7 @@ class StudentsPanel(tk.Frame):
             try:
                 self.student_svc.delete(self._selected_id)
                 self._selected_id = None
-                self._load()
+                self._reload()
                 show_success("Deleted", "Student deleted successfully.")
             except Exception as e:
                 show_error("Error", str(e))
@@ -5,14 +5,22 @@ import tkinter as tk
 from config import COLORS, FONTS
 from views.base_dashboard import BaseDashboard
 from views.results_panel import ResultsPanel
-from services import StudentService, SubjectService, ResultService, ClassService
-from config import SessionLocal
+from services import (
+    StudentService, SubjectService, ResultService, ClassService, ImportService,
+    SessionManager,
+)
 
 
 class TeacherDashboard(BaseDashboard):
+    SECTION_TABLES = {
+        "My Subjects & Marks": ("results", "students", "subjects", "classes"),
+        "My Class Performance": ("results", "subjects", "classes"),
+    }
+
     def __init__(self, master, user, logout_callback):
         self._user = user
         self._logout_callback = logout_callback
+        self.sessions = SessionManager(schedule=master.after_idle)
         self._init_services(user)
         self.NAV_ITEMS = [
             ("My Subjects & Marks", self._show_results),
@@ -22,18 +30,20 @@ class TeacherDashboard(BaseDashboard):
         self._nav_click("My Subjects & Marks", self._show_results)
 
     def _init_services(self, user):
-        # Create separate session for each service to prevent transaction issues
-        self.student_svc = StudentService(SessionLocal())
-        self.subject_svc = SubjectService(SessionLocal())
-        self.result_svc = ResultService(SessionLocal())
-        self.class_svc = ClassService(SessionLocal())
+        # All services share the dashboard's scoped session
+        db = self.sessions.session
+        self.student_svc = StudentService(db)
+        self.subject_svc = SubjectService(db)
+        self.result_svc = ResultService(db)
+        self.class_svc = ClassService(db)
+        self.import_svc = ImportService(db)
 
     def _show_results(self):
         self.update_section_title("Enter Student Marks")
         ResultsPanel(
             self.get_content_frame(),
             self.result_svc, self.student_svc, self.subject_svc, self.class_svc,
-            teacher=self.user,
+            teacher=self.user, import_svc=self.import_svc,
         )
 
     def _show_class_perf(self):
@@ -5,7 +5,7 @@ import tkinter as tk
 from tkinter import ttk
 from config import COLORS, FONTS
 from utils.ui_helpers import (
-    scrollable_treeview, make_entry, make_label,
+    scrollable_treeview, KeyedTree, make_entry, make_label,
     confirm_delete, show_error, show_success, show_info
 )
 
@@ -40,20 +40,19 @@ class TeachersPanel(tk.Frame):
         widths = [40, 180, 200, 200, 120]
         for col, w in zip(cols, widths):
             self.tree.column(col, width=w, minwidth=w)
-        self.tree.tag_configure("odd", background=COLORS["table_odd"])
-        self.tree.tag_configure("even", background=COLORS["table_even"])
+        self.rows = KeyedTree(self.tree, stripe=True)
         self.tree.bind("<<TreeviewSelect>>", lambda e: self._on_select())
 
     def _load(self):
-        self.tree.delete(*self.tree.get_children())
+        rows = []
         teachers = self.teacher_svc.get_all()
-        for i, t in enumerate(teachers):
+        for t in teachers:
             subj_names = ", ".join(s.subject_name for s in t.subjects) or "—"
-            tag = "odd" if i % 2 else "even"
-            self.tree.insert("", "end", iid=str(t.id), tags=(tag,), values=(
+            rows.append((t.id, (
                 t.id, t.full_name, t.email, subj_names,
                 t.created_at.strftime("%Y-%m-%d"),
-            ))
+            ), ()))
+        self.rows.sync(rows)
 
     def _on_select(self):
         sel = self.tree.selection()